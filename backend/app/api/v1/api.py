@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 
 # Import the routers from the specific endpoint files
-from app.api.v1.endpoints import pipelines, projects, dashboard
+from app.api.v1.endpoints import pipelines, projects, dashboard, logic
 
 # Main router for the v1 API
 api_v1_router = APIRouter()
@@ -12,6 +12,8 @@ api_v1_router.include_router(pipelines.router, prefix="/pipelines", tags=["Pipel
 api_v1_router.include_router(projects.router, prefix="/projects", tags=["Projects"])
 # Include the dashboard router
 api_v1_router.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
+# Include the logic (optimization) router
+api_v1_router.include_router(logic.router, prefix="/logic", tags=["Logic"])
 
 # You can include other endpoint routers here in the future, similar to the line above
 # e.g., api_v1_router.include_router(projects.router, prefix="/projects", tags=["Projects"])
@@ -1,11 +1,14 @@
 import asyncio
 from fastapi import APIRouter, Depends, HTTPException
-from supabase import Client
 from pydantic import BaseModel
 import logging
+from typing import TYPE_CHECKING
 
 from app.services.supabase_client import get_supabase_client, count_projects, count_pipelines
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,7 +21,7 @@ class DashboardSummaryResponse(BaseModel):
 
 @router.get("/summary", response_model=DashboardSummaryResponse)
 async def get_dashboard_summary(
-    supabase: Client = Depends(get_supabase_client)
+    supabase: "Client" = Depends(get_supabase_client)
 ):
     """Endpoint to fetch summary data for the dashboard."""
     try:
@@ -0,0 +1,113 @@
+import asyncio
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+import logging
+from typing import TYPE_CHECKING
+
+from app.services.logic_service import (
+    DEFAULT_YEAR,
+    DEFAULT_ZONE,
+    dataset_name,
+    zone_available,
+    price_years,
+    claim_surface_build,
+    get_surface_status,
+    build_revenue_surface,
+    get_revenue_surface,
+    run_optimization,
+    run_portfolio
+)
+from app.services.supabase_client import get_supabase_client, fetch_projects_for_pipeline
+from app.schemas.logic_schema import (
+    BatteryConfig,
+    RevenueEstimateResponse,
+    SurfaceStatusResponse,
+    OptimizationSummaryResponse,
+    PortfolioSimulationResponse
+)
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+def valid_zone(zone: str = Query(DEFAULT_ZONE, description="Bidding zone of the prices")) -> str:
+    """Dependency returning the requested bidding zone, or 404 if it has no day-ahead prices."""
+    if not zone_available(zone):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"No day-ahead prices available for bidding zone {zone}")
+    return zone
+
+@router.post("/surfaces/{year}", response_model=SurfaceStatusResponse, status_code=status.HTTP_202_ACCEPTED)
+async def start_surface_build(
+    year: int,
+    background_tasks: BackgroundTasks,
+    zone: str = Depends(valid_zone)
+):
+    """Endpoint to start precomputing the revenue surface of a price year in the background."""
+    logger.info(f"Received request to build revenue surface for {zone} {year}")
+    if year not in await asyncio.to_thread(price_years, zone):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"No day-ahead prices available for {zone} in {year}")
+    if claim_surface_build(year, zone):
+        background_tasks.add_task(build_revenue_surface, year, zone)
+    return SurfaceStatusResponse(dataset=dataset_name(year, zone), status="building")
+
+@router.get("/surfaces/{year}", response_model=SurfaceStatusResponse)
+async def get_surface_build_status(
+    year: int,
+    zone: str = Depends(valid_zone)
+):
+    """Endpoint to check whether the revenue surface of a price year is available."""
+    return SurfaceStatusResponse(dataset=dataset_name(year, zone), status=get_surface_status(year, zone))
+
+@router.get("/estimate", response_model=RevenueEstimateResponse)
+async def estimate_revenue(
+    year: int = Query(DEFAULT_YEAR, description="Price year to estimate the revenue for"),
+    zone: str = Depends(valid_zone),
+    max_charging: float = Query(..., gt=0, description="Maximum charging power in MW"),
+    max_discharging: float = Query(..., gt=0, description="Maximum discharging power in MW"),
+    battery_energy_capacity: float = Query(..., gt=0, description="Energy capacity in MWh"),
+    min_soc: float = Query(..., ge=0, le=1, description="Minimum state of charge (0-1)"),
+    max_soc: float = Query(..., ge=0, le=1, description="Maximum state of charge (0-1)")
+):
+    """Endpoint to get an instant revenue estimate interpolated from the precomputed surface."""
+    surface = get_revenue_surface(year, zone)
+    if surface is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"Revenue surface for {zone} {year} is not available. Build it first.")
+    return surface.estimate(max_charging, max_discharging, battery_energy_capacity, min_soc, max_soc)
+
+@router.post("/optimize", response_model=OptimizationSummaryResponse)
+async def optimize_battery(
+    config: BatteryConfig,
+    year: int = Query(DEFAULT_YEAR, description="Price year to optimize over"),
+    zone: str = Depends(valid_zone)
+):
+    """Endpoint to run an exact optimization for a battery configuration."""
+    logger.info(f"Received request to optimize battery for {zone} {year}: {config.model_dump()}")
+    try:
+        return await run_optimization(config.model_dump(), year, zone)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error optimizing battery: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error running the optimization")
+
+@router.post("/pipelines/{pipeline_id}/simulate", response_model=PortfolioSimulationResponse)
+async def simulate_pipeline(
+    pipeline_id: str,
+    year: int = Query(DEFAULT_YEAR, description="Price year to optimize over"),
+    supabase_client: "Client" = Depends(get_supabase_client)
+):
+    """Endpoint to optimize every project of a pipeline on the prices of its country's bidding zone."""
+    logger.info(f"Received request to simulate pipeline {pipeline_id} for {year}")
+    try:
+        projects = await fetch_projects_for_pipeline(supabase_client, pipeline_id)
+        return await run_portfolio(projects, year)
+    except Exception as e:
+        logger.error(f"Error simulating pipeline {pipeline_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error simulating the pipeline")
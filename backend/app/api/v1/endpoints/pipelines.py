@@ -1,12 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from supabase import Client
 import logging
-from typing import List
+from typing import List, TYPE_CHECKING
 
 # Import Supabase functions
 from app.services.supabase_client import get_supabase_client, fetch_pipelines, insert_pipeline
 # Import schemas from the dedicated file
-from app.schemas.pipelines_schema import PipelineCreate, PipelineResponse
+from app.schemas.pipelines_schema import PipelineCreate, PipelineResponse, pipeline_list_adapter
+from app.api.v1.responses import list_response
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,15 +21,15 @@ router = APIRouter()
 # GET all pipelines
 @router.get("/", response_model=List[PipelineResponse])
 async def get_all_pipelines(
-    supabase_client: Client = Depends(get_supabase_client)
+    supabase_client: "Client" = Depends(get_supabase_client)
 ):
     """Endpoint to fetch all pipelines."""
     logger.info("Received request to get all pipelines")
     try:
         pipelines = await fetch_pipelines(supabase_client)
         logger.info(f"Successfully retrieved {len(pipelines)} pipelines.")
-        # FastAPI will automatically validate the list against PipelineResponse
-        return pipelines 
+        # Validate the whole list against PipelineResponse in one pass and send it as JSON bytes
+        return list_response(pipeline_list_adapter, pipelines)
     except Exception as e:
         logger.error(f"Error fetching pipelines: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error fetching pipelines")
@@ -35,7 +38,7 @@ async def get_all_pipelines(
 @router.post("/", response_model=PipelineResponse, status_code=status.HTTP_201_CREATED)
 async def create_new_pipeline(
     pipeline_in: PipelineCreate, # Use imported schema
-    supabase_client: Client = Depends(get_supabase_client)
+    supabase_client: "Client" = Depends(get_supabase_client)
 ):
     """Endpoint to create a new pipeline."""
     logger.info(f"Received request to create pipeline: {pipeline_in.name}")
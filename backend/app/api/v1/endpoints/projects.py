@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from supabase import Client
 import logging
-from typing import List
+from typing import List, TYPE_CHECKING
 
 # Import Supabase functions and client getter
 from app.services.supabase_client import (
@@ -11,7 +10,11 @@ from app.services.supabase_client import (
     fetch_project_by_id
 )
 # Import schemas
-from app.schemas.projects_schema import ProjectCreate, ProjectResponse
+from app.schemas.projects_schema import ProjectCreate, ProjectResponse, project_list_adapter
+from app.api.v1.responses import list_response
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,7 +25,7 @@ router = APIRouter()
 @router.post("/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_new_project(
     project_in: ProjectCreate,
-    supabase_client: Client = Depends(get_supabase_client)
+    supabase_client: "Client" = Depends(get_supabase_client)
 ):
     """Endpoint to create a new project associated with a pipeline."""
     logger.info(f"Received request to create project: {project_in.name} for pipeline {project_in.pipeline_id}")
@@ -42,14 +45,14 @@ async def create_new_project(
 @router.get("/", response_model=List[ProjectResponse])
 async def get_projects(
     pipeline_id: str = Query(..., description="The ID of the pipeline to fetch projects for"),
-    supabase_client: Client = Depends(get_supabase_client)
+    supabase_client: "Client" = Depends(get_supabase_client)
 ):
     """Endpoint to fetch projects filtered by pipeline_id."""
     logger.info(f"Received request to get projects for pipeline_id: {pipeline_id}")
     try:
         projects = await fetch_projects_for_pipeline(supabase_client, pipeline_id)
-        # FastAPI will validate the list against ProjectResponse
-        return projects
+        # Validate the whole list against ProjectResponse in one pass and send it as JSON bytes
+        return list_response(project_list_adapter, projects)
     except Exception as e:
         logger.error(f"Error fetching projects for pipeline {pipeline_id}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error fetching projects")
@@ -58,7 +61,7 @@ async def get_projects(
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project_details(
     project_id: str,
-    supabase_client: Client = Depends(get_supabase_client)
+    supabase_client: "Client" = Depends(get_supabase_client)
 ):
     """Endpoint to fetch details for a specific project by its ID."""
     logger.info(f"Received request to get details for project_id: {project_id}")
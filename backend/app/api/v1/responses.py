@@ -0,0 +1,29 @@
+from typing import Any, List
+
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+
+class JSONBytesResponse(Response):
+    """
+    JSON response rendered by pydantic-core (an ORJSON-style response class without the extra dependency).
+    Content that is already serialized to bytes is sent as is.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return to_json(content)
+
+
+def list_response(adapter: TypeAdapter, rows: List[dict]) -> JSONBytesResponse:
+    """
+    Validates a list of rows with a prebuilt TypeAdapter and serializes it straight to JSON bytes.
+
+    Returning this from an endpoint bypasses FastAPI's response_model handling, which would validate
+    each row again and go through an intermediate dict before encoding. Keep response_model on the
+    route so the OpenAPI schema still documents the response.
+    """
+    return JSONBytesResponse(adapter.dump_json(adapter.validate_python(rows)))
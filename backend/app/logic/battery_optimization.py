@@ -5,6 +5,8 @@ from itertools import product
 import json
 from typing import Dict, List, Union, Any, Optional
 
+from app.logic.dispatch_kernels import ACTIONS, build_scenarios, dispatch, rollout
+
 class BatteryOptimizer:
     """
     A class for optimizing battery operations based on electricity prices.
@@ -63,80 +65,38 @@ class BatteryOptimizer:
         if prices is None:
             prices, datetimes = self._fetch_prices_from_csv()
         
-        # Convert prices to numpy array
-        prices_array = np.array(prices)
+        # Convert prices to numpy array (without copying if they already are one, e.g. in shared memory)
+        prices_array = np.asarray(prices)
         
-        # Initialize variables
-        soc = self.initial_soc
-        results = []
+        prices_array = prices_array.astype(float, copy=False)
+        actions, quantities, revenues, socs, charge_revenues, discharge_revenues, hold_revenues = \
+            self._run_dispatch(prices_array)
         
-        # Process each hour
-        for i in range(len(prices_array)):
-            current_price = prices_array[i]
-            
-            # Get future prices (up to look_ahead hours)
-            future_prices = prices_array[i+1:i+1+self.look_ahead]
-            
-            # Handle the case when we're at the end of the price data
-            if len(future_prices) == 0:
-                # If no future prices, use the current price
-                future_prices = np.array([current_price])
-            
-            # Get the price scenario for the action horizon
-            price_scenario = self._get_price_scenario(future_prices, self.action_horizon)
-            
-            # Evaluate potential actions
-            charge_revenue = self._evaluate_action('charge', soc, price_scenario, current_price, 
-                                                self.battery_energy_capacity, self.max_charging, 
-                                                self.min_soc, self.max_soc)
-            
-            discharge_revenue = self._evaluate_action('discharge', soc, price_scenario, current_price, 
-                                                   self.battery_energy_capacity, self.max_discharging, 
-                                                   self.min_soc, self.max_soc)
-            
-            hold_revenue = self._evaluate_action('hold', soc, price_scenario, current_price, 
-                                              self.battery_energy_capacity, 0, 
-                                              self.min_soc, self.max_soc)
-            
-            # Choose the action with the highest expected revenue
-            revenues = {
-                'charge': charge_revenue,
-                'discharge': discharge_revenue,
-                'hold': hold_revenue
-            }
-            
-            best_action = max(revenues, key=revenues.get)
-            best_revenue = revenues[best_action]
-            
-            # Calculate the actual quantity and update SOC
-            quantity = 0
-            revenue = 0
-            
-            if best_action == 'charge' and soc < self.max_soc:
-                quantity = min(self.max_charging, (self.max_soc - soc) * self.battery_energy_capacity)
-                soc += quantity / self.battery_energy_capacity
-                revenue = -quantity * current_price
-            elif best_action == 'discharge' and soc > self.min_soc:
-                quantity = min(self.max_discharging, (soc - self.min_soc) * self.battery_energy_capacity)
-                soc -= quantity / self.battery_energy_capacity
-                revenue = quantity * current_price
-            
-            # Store results
+        expected_revenues = np.choose(actions, [charge_revenues, discharge_revenues, hold_revenues])
+        soc = socs[-1] if len(socs) else self.initial_soc
+        
+        # Store results
+        results = []
+        columns = zip(prices_array.tolist(), actions.tolist(), quantities.tolist(), revenues.tolist(),
+                      expected_revenues.tolist(), socs.tolist(), charge_revenues.tolist(),
+                      discharge_revenues.tolist(), hold_revenues.tolist())
+        for i, (price, action, quantity, revenue, expected_revenue, hour_soc,
+                charge_revenue, discharge_revenue, hold_revenue) in enumerate(columns):
             result = {
                 'hour': i,
-                'price': float(current_price),
-                'action': best_action,
-                'quantity': float(quantity),
-                'revenue': float(revenue),
-                'expected_revenue': float(best_revenue),
-                'soc': float(soc),
-                'charge_revenue': float(charge_revenue),
-                'discharge_revenue': float(discharge_revenue),
-                'hold_revenue': float(hold_revenue)
+                'price': price,
+                'action': ACTIONS[action],
+                'quantity': quantity,
+                'revenue': revenue,
+                'expected_revenue': expected_revenue,
+                'soc': hour_soc,
+                'charge_revenue': charge_revenue,
+                'discharge_revenue': discharge_revenue,
+                'hold_revenue': hold_revenue
             }
             
             # Add datetime if provided
-            if datetimes and i < len(datetimes):
+            if datetimes is not None and i < len(datetimes):
                 result['datetime'] = datetimes[i]
                 
             results.append(result)
@@ -175,6 +135,102 @@ class BatteryOptimizer:
         
         return response
     
+    def _run_dispatch(self, prices_array: np.ndarray) -> tuple:
+        """
+        Run the hour-by-hour dispatch in the compiled kernel (plain Python when Numba is not installed).
+        
+        Parameters:
+        - prices_array: Array of hourly electricity prices (float)
+        
+        Returns:
+        - Tuple of arrays (action codes, quantity, revenue, soc, charge_revenue, discharge_revenue,
+          hold_revenue), one entry per hour (see dispatch_kernels.dispatch)
+        """
+        scenarios = build_scenarios(prices_array, self.look_ahead, self.action_horizon)
+        return dispatch(prices_array, scenarios, float(self.battery_energy_capacity), float(self.max_charging),
+                        float(self.max_discharging), float(self.min_soc), float(self.max_soc),
+                        float(self.initial_soc))
+    
+    def _dispatch_step(self, i: int, soc: float, prices_array: np.ndarray, 
+                       max_charging: float, max_discharging: float, 
+                       min_soc: float, max_soc: float) -> Dict[str, Any]:
+        """
+        Decide and apply the action for a single hour.
+        Power and SOC limits are passed explicitly so that callers can restrict
+        them hour by hour (e.g. when part of the battery is reserved for other markets).
+        
+        Parameters:
+        - i: Index of the current hour in prices_array
+        - soc: State of charge at the start of the hour
+        - prices_array: Array of hourly electricity prices
+        - max_charging: Charging power available in this hour in MW
+        - max_discharging: Discharging power available in this hour in MW
+        - min_soc: Minimum state of charge allowed in this hour
+        - max_soc: Maximum state of charge allowed in this hour
+        
+        Returns:
+        - Dictionary with the chosen action, quantity, revenue, the SOC at the end
+          of the hour and the expected revenue of each candidate action
+        """
+        current_price = prices_array[i]
+        
+        # Get future prices (up to look_ahead hours)
+        future_prices = prices_array[i+1:i+1+self.look_ahead]
+        
+        # Handle the case when we're at the end of the price data
+        if len(future_prices) == 0:
+            # If no future prices, use the current price
+            future_prices = np.array([current_price])
+        
+        # Get the price scenario for the action horizon
+        price_scenario = self._get_price_scenario(future_prices, self.action_horizon)
+        
+        # Evaluate potential actions
+        charge_revenue = self._evaluate_action('charge', soc, price_scenario, current_price, 
+                                            self.battery_energy_capacity, max_charging, 
+                                            min_soc, max_soc)
+        
+        discharge_revenue = self._evaluate_action('discharge', soc, price_scenario, current_price, 
+                                               self.battery_energy_capacity, max_discharging, 
+                                               min_soc, max_soc)
+        
+        hold_revenue = self._evaluate_action('hold', soc, price_scenario, current_price, 
+                                          self.battery_energy_capacity, 0, 
+                                          min_soc, max_soc)
+        
+        # Choose the action with the highest expected revenue
+        revenues = {
+            'charge': charge_revenue,
+            'discharge': discharge_revenue,
+            'hold': hold_revenue
+        }
+        
+        best_action = max(revenues, key=revenues.get)
+        
+        # Calculate the actual quantity and update SOC
+        quantity = 0
+        revenue = 0
+        
+        if best_action == 'charge' and soc < max_soc:
+            quantity = min(max_charging, (max_soc - soc) * self.battery_energy_capacity)
+            soc += quantity / self.battery_energy_capacity
+            revenue = -quantity * current_price
+        elif best_action == 'discharge' and soc > min_soc:
+            quantity = min(max_discharging, (soc - min_soc) * self.battery_energy_capacity)
+            soc -= quantity / self.battery_energy_capacity
+            revenue = quantity * current_price
+        
+        return {
+            'action': best_action,
+            'quantity': quantity,
+            'revenue': revenue,
+            'soc': soc,
+            'expected_revenue': revenues[best_action],
+            'charge_revenue': charge_revenue,
+            'discharge_revenue': discharge_revenue,
+            'hold_revenue': hold_revenue
+        }
+    
     def _fetch_prices_from_csv(self) -> tuple:
         """
         Fetch price data from the default CSV file.
@@ -182,8 +238,8 @@ class BatteryOptimizer:
         Returns:
         - Tuple of (prices, datetimes)
         """
-        # Load from the wholesale file
-        df = pd.read_csv('data/wholesale_energy_prices.csv')
+        # Load from the wholesale file (resolved relative to this module, so it works from any working directory)
+        df = pd.read_csv(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'wholesale_energy_prices.csv'))
         
         df['datetime'] = pd.to_datetime(df['datetime'])
         
@@ -235,63 +291,10 @@ class BatteryOptimizer:
         Returns:
         - Expected revenue for the action
         """
-        horizon = len(price_scenario)
-        
-        # Calculate the immediate revenue from the action
-        immediate_revenue = 0
-        next_soc = current_soc
-        
-        if action == 'charge' and current_soc < max_soc:
-            quantity = min(max_power, (max_soc - current_soc) * battery_energy_capacity)
-            next_soc = current_soc + quantity / battery_energy_capacity
-            immediate_revenue = -quantity * current_price
-        elif action == 'discharge' and current_soc > min_soc:
-            quantity = min(max_power, (current_soc - min_soc) * battery_energy_capacity)
-            next_soc = current_soc - quantity / battery_energy_capacity
-            immediate_revenue = quantity * current_price
-        
-        # Calculate the optimal future actions based on the price scenario
-        scenario_revenue = immediate_revenue
-        scenario_soc = next_soc
-        
-        # For each future hour in the scenario
-        for h in range(1, horizon):
-            future_price = price_scenario[h]
-            
-            # Determine the best action for this future hour
-            future_charge_revenue = self._evaluate_single_step('charge', scenario_soc, future_price, 
-                                                           battery_energy_capacity, max_power, 
-                                                           min_soc, max_soc)
-            
-            future_discharge_revenue = self._evaluate_single_step('discharge', scenario_soc, future_price, 
-                                                              battery_energy_capacity, max_power, 
-                                                              min_soc, max_soc)
-            
-            future_hold_revenue = self._evaluate_single_step('hold', scenario_soc, future_price, 
-                                                         battery_energy_capacity, 0, 
-                                                         min_soc, max_soc)
-            
-            # Choose the best action
-            future_revenues = {
-                'charge': future_charge_revenue['revenue'],
-                'discharge': future_discharge_revenue['revenue'],
-                'hold': future_hold_revenue['revenue']
-            }
-            
-            best_future_action = max(future_revenues, key=future_revenues.get)
-            
-            # Update scenario revenue and SOC
-            if best_future_action == 'charge':
-                scenario_revenue += future_charge_revenue['revenue']
-                scenario_soc = future_charge_revenue['next_soc']
-            elif best_future_action == 'discharge':
-                scenario_revenue += future_discharge_revenue['revenue']
-                scenario_soc = future_discharge_revenue['next_soc']
-            else:  # hold
-                scenario_revenue += future_hold_revenue['revenue']
-                scenario_soc = future_hold_revenue['next_soc']
-        
-        return scenario_revenue
+        # The rollout is the innermost loop of the optimizer and runs in the compiled kernel
+        return rollout(ACTIONS.index(action), float(current_soc), np.asarray(price_scenario, dtype=float),
+                       float(current_price), float(battery_energy_capacity), float(max_power),
+                       float(min_soc), float(max_soc))
     
     def _evaluate_single_step(self, action: str, current_soc: float, price: float, 
                             battery_energy_capacity: float, max_power: float, 
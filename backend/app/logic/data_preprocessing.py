@@ -1,51 +1,128 @@
 import pandas as pd
 import os
 
+# Manually downloaded energy-charts exports, in chronological order
+ENERGY_FILES = [
+    'data/energy-charts_Electricity_production_and_spot_prices_in_Germany_in_2023.csv',
+    'data/energy-charts_Electricity_production_and_spot_prices_in_Germany_in_2024.csv'
+]
+
+OUTPUT_FILE = 'data/combined_energy_prices.csv'
+
+# Rows read at a time by the streaming preprocessing
+DEFAULT_CHUNK_ROWS = 50_000
+
+def _read_prices(df):
+    """
+    Rename the columns of an energy-charts export and parse its timestamps as UTC
+    """
+    # Rename columns for clarity
+    df = df.rename(columns={
+        'Date (GMT+1)': 'datetime',
+        'Day Ahead Auction (DE-LU)': 'price_eur_mwh'
+    })
+
+    # Convert datetime string to datetime object, handling the timezone
+    df['datetime'] = pd.to_datetime(df['datetime'], utc=True)
+
+    return df
+
+def _to_local_time(df):
+    """
+    Convert the UTC timestamps of a price dataframe to naive local time
+    """
+    return df.assign(datetime=df['datetime'].dt.tz_convert('Europe/Berlin').dt.tz_localize(None))
+
+def _prepare_prices(df):
+    """
+    Rename the columns of an energy-charts export and convert its timestamps to local time
+    """
+    return _to_local_time(_read_prices(df))
+
 def process_energy_data():
     """
     Process the manually downloaded energy price CSV files and combine them into a single dataframe
     """
-    # List of files to process
-    files = [
-        'data/energy-charts_Electricity_production_and_spot_prices_in_Germany_in_2023.csv',
-        'data/energy-charts_Electricity_production_and_spot_prices_in_Germany_in_2024.csv'
-    ]
-    
     # Initialize an empty list to store dataframes
     dfs = []
-    
-    for file in files:
+
+    for file in ENERGY_FILES:
         # Read the CSV file, skipping the second row (Price (EUR/MWh, EUR/tCO2))
-        df = pd.read_csv(file, skiprows=[1])
-        
-        # Rename columns for clarity
-        df = df.rename(columns={
-            'Date (GMT+1)': 'datetime',
-            'Day Ahead Auction (DE-LU)': 'price_eur_mwh'
-        })
-        
-        # Convert datetime string to datetime object, handling the timezone
-        df['datetime'] = pd.to_datetime(df['datetime'], utc=True).dt.tz_convert('Europe/Berlin').dt.tz_localize(None)
-        
+        df = _prepare_prices(pd.read_csv(file, skiprows=[1]))
+
         # Append to the list of dataframes
         dfs.append(df)
-    
+
     # Combine all dataframes
     combined_df = pd.concat(dfs, ignore_index=True)
-    
+
     # Sort by datetime
     combined_df = combined_df.sort_values('datetime')
-    
+
     # Save the combined dataframe to a new CSV file
-    output_file = 'data/combined_energy_prices.csv'
-    combined_df.to_csv(output_file, index=False)
-    print(f"Combined data saved to {output_file}")
-    
+    combined_df.to_csv(OUTPUT_FILE, index=False)
+    print(f"Combined data saved to {OUTPUT_FILE}")
+
     # Display some basic information about the data
     print("\nData Summary:")
     print(f"Total number of records: {len(combined_df)}")
     print(f"Date range: from {combined_df['datetime'].min()} to {combined_df['datetime'].max()}")
     print(f"Price range: from {combined_df['price_eur_mwh'].min()} to {combined_df['price_eur_mwh'].max()} EUR/MWh")
 
+def process_energy_data_streaming(files=None, output_file=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Same output as process_energy_data, written chunk by chunk so that memory use is bounded
+    by chunk_rows instead of the length of the history. Rows are ordered on their UTC
+    timestamps, since local time repeats the hour (or the quarter-hours) at the end of daylight
+    saving time, and repeated records (e.g. where two files overlap) are written once. Rows are
+    only sorted within a chunk, so the files must be in chronological order (each file sorted,
+    one file after the other).
+    """
+    files = files or ENERGY_FILES
+    output_file = output_file or OUTPUT_FILE
+
+    # Running summary statistics, updated chunk by chunk
+    records = 0
+    first_datetime = last_datetime = None
+    min_price = max_price = None
+
+    # UTC timestamp and price of the last row written
+    last_record = None
+
+    with open(output_file, 'w', newline='') as output:
+        for file in files:
+            # Read the CSV file in chunks, skipping the second row (Price (EUR/MWh, EUR/tCO2))
+            with pd.read_csv(file, skiprows=[1], chunksize=chunk_rows) as reader:
+                for chunk in reader:
+                    df = _read_prices(chunk).sort_values('datetime', kind='stable').drop_duplicates()
+
+                    if last_record is not None and not df.empty:
+                        if df['datetime'].iloc[0] < last_record[0]:
+                            raise ValueError(f"Rows of {file} are not in chronological order; use process_energy_data")
+                        df = df[(df['datetime'] != last_record[0]) | (df['price_eur_mwh'] != last_record[1])]
+                    if df.empty:
+                        continue
+                    last_record = df['datetime'].iloc[-1], df['price_eur_mwh'].iloc[-1]
+
+                    df = _to_local_time(df)
+
+                    # Append the chunk, with the header only once
+                    df.to_csv(output, index=False, header=records == 0)
+
+                    records += len(df)
+                    first_datetime = first_datetime if first_datetime is not None else df['datetime'].iloc[0]
+                    last_datetime = df['datetime'].iloc[-1]
+                    chunk_min, chunk_max = df['price_eur_mwh'].min(), df['price_eur_mwh'].max()
+                    min_price = chunk_min if min_price is None else min(min_price, chunk_min)
+                    max_price = chunk_max if max_price is None else max(max_price, chunk_max)
+
+    print(f"Combined data saved to {output_file}")
+
+    # Display some basic information about the data
+    print("\nData Summary:")
+    print(f"Total number of records: {records}")
+    print(f"Date range: from {first_datetime} to {last_datetime}")
+    print(f"Price range: from {min_price} to {max_price} EUR/MWh")
+
 if __name__ == "__main__":
-    process_energy_data() 
\ No newline at end of file
+    process_energy_data()
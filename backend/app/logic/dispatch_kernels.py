@@ -0,0 +1,337 @@
+import numpy as np
+
+# Numba is optional: when it is installed the kernels below are JIT-compiled,
+# otherwise the same functions run as plain Python over NumPy arrays.
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """
+        Stand-in for numba.njit that returns the function unchanged.
+        """
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda function: function
+
+# Action codes, in the order BatteryOptimizer uses to break ties between equal revenues
+CHARGE = 0
+DISCHARGE = 1
+HOLD = 2
+ACTIONS = ('charge', 'discharge', 'hold')
+
+
+def build_scenarios(prices: np.ndarray, look_ahead: int, horizon: int) -> np.ndarray:
+    """
+    Build the price scenario of every hour in one vectorized pass.
+    Equivalent to calling BatteryOptimizer._get_price_scenario on the future prices of each hour:
+    the next `horizon` prices, padded with the last available one (or the current price at the end).
+
+    Parameters:
+    - prices: Array of hourly prices
+    - look_ahead: Number of future hours visible from each hour
+    - horizon: Number of hours in each scenario
+
+    Returns:
+    - Array of shape (len(prices), horizon)
+    """
+    n = len(prices)
+    hours = np.arange(n)[:, None]
+    available = np.minimum(n - 1 - hours, look_ahead)
+    index = np.minimum(hours + 1 + np.arange(horizon)[None, :], hours + available)
+    return prices[index]
+
+
+@njit(cache=True)
+def step_outcome(action, soc, price, battery_energy_capacity, max_power, min_soc, max_soc):
+    """
+    Revenue and next SOC of a single action (see BatteryOptimizer._evaluate_single_step).
+
+    Returns:
+    - Tuple of (revenue, next_soc)
+    """
+    if action == CHARGE and soc < max_soc:
+        quantity = min(max_power, (max_soc - soc) * battery_energy_capacity)
+        return -quantity * price, soc + quantity / battery_energy_capacity
+    if action == DISCHARGE and soc > min_soc:
+        quantity = min(max_power, (soc - min_soc) * battery_energy_capacity)
+        return quantity * price, soc - quantity / battery_energy_capacity
+    return 0.0, soc
+
+
+@njit(cache=True)
+def rollout(action, soc, scenario, current_price, battery_energy_capacity, max_power, min_soc, max_soc):
+    """
+    Expected revenue of an action followed by a greedy rollout over the scenario
+    (see BatteryOptimizer._evaluate_action).
+
+    Returns:
+    - Expected revenue of the action
+    """
+    revenue, soc = step_outcome(action, soc, current_price, battery_energy_capacity, max_power, min_soc, max_soc)
+
+    for h in range(1, len(scenario)):
+        price = scenario[h]
+        charge_revenue, charge_soc = step_outcome(CHARGE, soc, price, battery_energy_capacity,
+                                                  max_power, min_soc, max_soc)
+        discharge_revenue, discharge_soc = step_outcome(DISCHARGE, soc, price, battery_energy_capacity,
+                                                        max_power, min_soc, max_soc)
+        hold_revenue, hold_soc = step_outcome(HOLD, soc, price, battery_energy_capacity,
+                                              0.0, min_soc, max_soc)
+
+        # Ties go to the first action in (charge, discharge, hold) order
+        if charge_revenue >= discharge_revenue and charge_revenue >= hold_revenue:
+            revenue += charge_revenue
+            soc = charge_soc
+        elif discharge_revenue >= hold_revenue:
+            revenue += discharge_revenue
+            soc = discharge_soc
+        else:
+            revenue += hold_revenue
+            soc = hold_soc
+
+    return revenue
+
+
+@njit(cache=True)
+def settle(action, soc, price, battery_energy_capacity, max_charging, max_discharging, min_soc, max_soc):
+    """
+    Apply the chosen action of an hour at the realized price.
+
+    Returns:
+    - Tuple of (quantity, revenue, soc at the end of the hour)
+    """
+    if action == CHARGE and soc < max_soc:
+        quantity = min(max_charging, (max_soc - soc) * battery_energy_capacity)
+        return quantity, -quantity * price, soc + quantity / battery_energy_capacity
+    if action == DISCHARGE and soc > min_soc:
+        quantity = min(max_discharging, (soc - min_soc) * battery_energy_capacity)
+        return quantity, quantity * price, soc - quantity / battery_energy_capacity
+    return 0.0, 0.0, soc
+
+
+@njit(cache=True)
+def dispatch(prices, scenarios, battery_energy_capacity, max_charging, max_discharging,
+             min_soc, max_soc, initial_soc):
+    """
+    Run the hour-by-hour dispatch of BatteryOptimizer.optimize with constant limits.
+
+    Returns:
+    - Tuple of arrays (action, quantity, revenue, soc, charge_revenue, discharge_revenue, hold_revenue),
+      one entry per hour; soc is the state of charge at the end of the hour
+    """
+    n = len(prices)
+    actions = np.empty(n, dtype=np.int64)
+    quantities = np.empty(n)
+    revenues = np.empty(n)
+    socs = np.empty(n)
+    charge_revenues = np.empty(n)
+    discharge_revenues = np.empty(n)
+    hold_revenues = np.empty(n)
+
+    soc = initial_soc
+    for i in range(n):
+        price = prices[i]
+        scenario = scenarios[i]
+
+        charge_revenue = rollout(CHARGE, soc, scenario, price, battery_energy_capacity,
+                                 max_charging, min_soc, max_soc)
+        discharge_revenue = rollout(DISCHARGE, soc, scenario, price, battery_energy_capacity,
+                                    max_discharging, min_soc, max_soc)
+        hold_revenue = rollout(HOLD, soc, scenario, price, battery_energy_capacity,
+                               0.0, min_soc, max_soc)
+
+        if charge_revenue >= discharge_revenue and charge_revenue >= hold_revenue:
+            action = CHARGE
+        elif discharge_revenue >= hold_revenue:
+            action = DISCHARGE
+        else:
+            action = HOLD
+
+        quantity, revenue, soc = settle(action, soc, price, battery_energy_capacity,
+                                        max_charging, max_discharging, min_soc, max_soc)
+
+        actions[i] = action
+        quantities[i] = quantity
+        revenues[i] = revenue
+        socs[i] = soc
+        charge_revenues[i] = charge_revenue
+        discharge_revenues[i] = discharge_revenue
+        hold_revenues[i] = hold_revenue
+
+    return actions, quantities, revenues, socs, charge_revenues, discharge_revenues, hold_revenues
+
+
+@njit(cache=True)
+def scenario_score(action, soc, scenarios, current_price, battery_energy_capacity, max_power,
+                   min_soc, max_soc, tail_count):
+    """
+    Score of an action over K price scenarios: the mean revenue of the tail_count worst rollouts.
+    tail_count = K gives the expected value, a smaller tail_count the CVaR of the worst outcomes.
+
+    Parameters:
+    - scenarios: Array of shape (K, horizon), one price scenario per row
+
+    Returns:
+    - Score of the action
+    """
+    k = scenarios.shape[0]
+    revenues = np.empty(k)
+    for j in range(k):
+        revenues[j] = rollout(action, soc, scenarios[j], current_price, battery_energy_capacity,
+                              max_power, min_soc, max_soc)
+
+    if tail_count < k:
+        revenues = np.sort(revenues)
+    total = 0.0
+    for j in range(tail_count):
+        total += revenues[j]
+    return total / tail_count
+
+
+@njit(cache=True)
+def dispatch_scenarios(prices, scenarios, battery_energy_capacity, max_charging, max_discharging,
+                       min_soc, max_soc, initial_soc, tail_count):
+    """
+    Hour-by-hour dispatch where each action is scored over K price scenarios (see scenario_score)
+    and the chosen action is settled at the realized price of the hour.
+
+    Parameters:
+    - scenarios: Array of shape (hours, K, horizon)
+
+    Returns:
+    - Same arrays as dispatch(), with the scores in place of the expected revenues
+    """
+    n = len(prices)
+    actions = np.empty(n, dtype=np.int64)
+    quantities = np.empty(n)
+    revenues = np.empty(n)
+    socs = np.empty(n)
+    charge_revenues = np.empty(n)
+    discharge_revenues = np.empty(n)
+    hold_revenues = np.empty(n)
+
+    soc = initial_soc
+    for i in range(n):
+        price = prices[i]
+
+        charge_revenue = scenario_score(CHARGE, soc, scenarios[i], price, battery_energy_capacity,
+                                        max_charging, min_soc, max_soc, tail_count)
+        discharge_revenue = scenario_score(DISCHARGE, soc, scenarios[i], price, battery_energy_capacity,
+                                           max_discharging, min_soc, max_soc, tail_count)
+        hold_revenue = scenario_score(HOLD, soc, scenarios[i], price, battery_energy_capacity,
+                                      0.0, min_soc, max_soc, tail_count)
+
+        if charge_revenue >= discharge_revenue and charge_revenue >= hold_revenue:
+            action = CHARGE
+        elif discharge_revenue >= hold_revenue:
+            action = DISCHARGE
+        else:
+            action = HOLD
+
+        quantity, revenue, soc = settle(action, soc, price, battery_energy_capacity,
+                                        max_charging, max_discharging, min_soc, max_soc)
+
+        actions[i] = action
+        quantities[i] = quantity
+        revenues[i] = revenue
+        socs[i] = soc
+        charge_revenues[i] = charge_revenue
+        discharge_revenues[i] = discharge_revenue
+        hold_revenues[i] = hold_revenue
+
+    return actions, quantities, revenues, socs, charge_revenues, discharge_revenues, hold_revenues
+
+
+def scenario_scores_batched(soc, scenarios, current_price, battery_energy_capacity, max_charging,
+                            max_discharging, min_soc, max_soc, tail_count):
+    """
+    Scores of the three actions over K price scenarios (see scenario_score), with the rollouts
+    of all scenarios and actions advanced together as a (3, K) array at each step of the horizon.
+    Used instead of scenario_score when Numba is not installed; the results are identical.
+
+    Parameters:
+    - scenarios: Array of shape (K, horizon), one price scenario per row
+
+    Returns:
+    - Array of the scores of charge, discharge and hold
+    """
+    k = scenarios.shape[0]
+
+    # Immediate outcome of each action at the current price, and the power limit of its rollout
+    max_power = np.array([[max_charging], [max_discharging], [0.0]])
+    revenue = np.empty((3, k))
+    state = np.empty((3, k))
+    for action, power in ((CHARGE, max_charging), (DISCHARGE, max_discharging), (HOLD, 0.0)):
+        revenue[action], state[action] = step_outcome(action, soc, current_price, battery_energy_capacity,
+                                                      power, min_soc, max_soc)
+
+    # Energy bought by each candidate action (charge, discharge, hold) of every rollout. Charging
+    # earns -quantity * price and discharging quantity * price, so with the discharged energy
+    # counted negative, the revenue of every candidate is quantity * -price.
+    quantities = np.zeros((3, 3, k))
+    negative_prices = -scenarios
+    rollouts = np.arange(3)[:, None], np.arange(k)[None, :]
+
+    for h in range(1, scenarios.shape[1]):
+        np.maximum(np.minimum((max_soc - state) * battery_energy_capacity, max_power), 0.0, out=quantities[CHARGE])
+        np.maximum(np.minimum((state - min_soc) * battery_energy_capacity, max_power), 0.0, out=quantities[DISCHARGE])
+        np.negative(quantities[DISCHARGE], out=quantities[DISCHARGE])
+
+        # argmax takes the first of equal revenues, the (charge, discharge, hold) tie order
+        choice = (quantities * negative_prices[:, h]).argmax(axis=0)
+        quantity = quantities[(choice,) + rollouts]
+        revenue += quantity * negative_prices[:, h]
+        state += quantity / battery_energy_capacity
+
+    if tail_count < k:
+        revenue = np.sort(revenue, axis=1)
+    # Sequential sum of the tail, in the same order as scenario_score
+    return np.cumsum(revenue[:, :tail_count], axis=1)[:, -1] / tail_count
+
+
+def dispatch_scenarios_batched(prices, scenarios, battery_energy_capacity, max_charging, max_discharging,
+                               min_soc, max_soc, initial_soc, tail_count):
+    """
+    NumPy version of dispatch_scenarios for when Numba is not installed: the hours run in a Python
+    loop and the scenarios of each hour are scored with scenario_scores_batched.
+
+    Parameters:
+    - scenarios: Array of shape (hours, K, horizon)
+
+    Returns:
+    - Same arrays as dispatch_scenarios()
+    """
+    n = len(prices)
+    actions = np.empty(n, dtype=np.int64)
+    quantities = np.empty(n)
+    revenues = np.empty(n)
+    socs = np.empty(n)
+    scores = np.empty((n, 3))
+
+    soc = initial_soc
+    for i in range(n):
+        price = float(prices[i])
+        charge_revenue, discharge_revenue, hold_revenue = scenario_scores_batched(
+            soc, scenarios[i], price, battery_energy_capacity, max_charging, max_discharging,
+            min_soc, max_soc, tail_count).tolist()
+
+        if charge_revenue >= discharge_revenue and charge_revenue >= hold_revenue:
+            action = CHARGE
+        elif discharge_revenue >= hold_revenue:
+            action = DISCHARGE
+        else:
+            action = HOLD
+
+        quantity, revenue, soc = settle(action, soc, price, battery_energy_capacity,
+                                        max_charging, max_discharging, min_soc, max_soc)
+
+        actions[i] = action
+        quantities[i] = quantity
+        revenues[i] = revenue
+        socs[i] = soc
+        scores[i] = charge_revenue, discharge_revenue, hold_revenue
+
+    return actions, quantities, revenues, socs, scores[:, CHARGE], scores[:, DISCHARGE], scores[:, HOLD]
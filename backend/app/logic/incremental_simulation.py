@@ -0,0 +1,179 @@
+import numpy as np
+import json
+from typing import Dict, List, Any, Optional, Union
+
+from app.logic.battery_optimization import BatteryOptimizer
+from app.logic.dispatch_kernels import ACTIONS, build_scenarios, dispatch
+from app.logic.lifetime_simulation import optimizer_config_from_project
+
+# Hours between two checkpoints of the engine state (one per day of hourly prices)
+CHECKPOINT_HOURS = 24
+
+
+class IncrementalSimulation:
+    """
+    Keeps the dispatch of a battery up to date as its price series grows or is revised.
+
+    The engine state (SOC, cumulative revenue and action counts) is checkpointed at every
+    day boundary. The decision of an hour only depends on the SOC at the start of the hour
+    and on the prices of the next action_horizon hours, so when prices change from hour j
+    onwards, every hour before j - action_horizon is unaffected. update() restarts the
+    dispatch from the last checkpoint before that hour instead of re-running the whole year,
+    and gives exactly the same summary as a full BatteryOptimizer.optimize() run.
+
+    Only the base BatteryOptimizer heuristic is supported: subclasses replace the dispatch
+    (and may look back in the price series), which this restart rule does not account for.
+    """
+
+    def __init__(self, optimizer: Optional[BatteryOptimizer] = None, checkpoint_hours: int = CHECKPOINT_HOURS):
+        """
+        Initialize an empty simulation.
+
+        Parameters:
+        - optimizer: Battery configuration to simulate (defaults to BatteryOptimizer(); subclasses are not supported)
+        - checkpoint_hours: Hours between two checkpoints
+        """
+        if checkpoint_hours < 1:
+            raise ValueError("checkpoint_hours must be at least 1")
+        if optimizer is not None and type(optimizer) is not BatteryOptimizer:
+            raise TypeError(f"IncrementalSimulation only supports BatteryOptimizer, not {type(optimizer).__name__}")
+
+        self.optimizer = optimizer or BatteryOptimizer()
+        self.checkpoint_hours = checkpoint_hours
+
+        self.prices = np.empty(0)
+
+        # State at the start of hours 0, checkpoint_hours, 2 * checkpoint_hours, ...
+        self._checkpoint_soc = np.array([float(self.optimizer.initial_soc)])
+        self._checkpoint_revenue = np.zeros(1)
+        self._checkpoint_counts = np.zeros((1, len(ACTIONS)), dtype=np.int64)
+
+        # State at the end of the last simulated hour
+        self._final_soc = float(self.optimizer.initial_soc)
+        self._total_revenue = 0.0
+        self._action_counts = np.zeros(len(ACTIONS), dtype=np.int64)
+
+    @classmethod
+    def from_project(cls, project: Dict[str, Any], **kwargs) -> 'IncrementalSimulation':
+        """
+        Create a simulation from a project record (ProjectBase fields).
+
+        Parameters:
+        - project: Project dictionary as stored in the 'projects' table
+        - kwargs: Additional IncrementalSimulation arguments
+
+        Returns:
+        - IncrementalSimulation instance
+        """
+        return cls(BatteryOptimizer(**optimizer_config_from_project(project)), **kwargs)
+
+    def update(self, prices: Union[List[float], np.ndarray]) -> Dict[str, Any]:
+        """
+        Bring the simulation up to date with a new version of the price series.
+        The series may be extended, revised or truncated; only the affected days are re-simulated.
+
+        Parameters:
+        - prices: Complete hourly price series
+
+        Returns:
+        - Dictionary with the summary (same format as BatteryOptimizer.optimize()) and
+          the hour from which the dispatch was re-simulated
+        """
+        prices = np.array(prices, dtype=float)
+
+        changed_hour = first_changed_hour(self.prices, prices)
+        if changed_hour == len(prices) == len(self.prices):
+            start = len(prices)
+        else:
+            start = self._restart_hour(changed_hour)
+            self._simulate_from(start, prices)
+        self.prices = prices
+
+        return {
+            'summary': self.summary(),
+            'resimulated_from': start
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summary of the current dispatch, in the format of BatteryOptimizer.optimize().
+
+        Returns:
+        - Dictionary with the total revenue, action counts, final SOC and parameters
+        """
+        return {
+            'total_revenue': float(self._total_revenue),
+            'action_counts': {action: int(count) for action, count in zip(ACTIONS, self._action_counts) if count},
+            'final_soc': float(self._final_soc),
+            'parameters': json.loads(self.optimizer.to_json())
+        }
+
+    def _restart_hour(self, changed_hour: int) -> int:
+        """
+        Hour of the last checkpoint whose state is not affected by a change of prices.
+
+        Parameters:
+        - changed_hour: First hour whose price (or presence) changed
+
+        Returns:
+        - Hour at which the dispatch has to be resumed
+        """
+        first_affected = max(changed_hour - self.optimizer.action_horizon, 0)
+        checkpoint = min(first_affected // self.checkpoint_hours, len(self._checkpoint_soc) - 1)
+        return checkpoint * self.checkpoint_hours
+
+    def _simulate_from(self, start: int, prices: np.ndarray) -> None:
+        """
+        Re-run the dispatch from a checkpoint to the end of the series and refresh the checkpoints.
+
+        Parameters:
+        - start: Hour of the checkpoint to resume from (a multiple of checkpoint_hours)
+        - prices: Complete hourly price series
+        """
+        optimizer = self.optimizer
+        checkpoint = start // self.checkpoint_hours
+        soc = self._checkpoint_soc[checkpoint]
+
+        # Scenarios only look forward, so the tail can be dispatched on its own
+        tail = prices[start:]
+        scenarios = build_scenarios(tail, optimizer.look_ahead, optimizer.action_horizon)
+        actions, _, revenues, socs, _, _, _ = dispatch(
+            tail, scenarios, float(optimizer.battery_energy_capacity), float(optimizer.max_charging),
+            float(optimizer.max_discharging), float(optimizer.min_soc), float(optimizer.max_soc), float(soc))
+
+        # Running totals are accumulated hour by hour, like BatteryOptimizer.optimize()
+        cumulative_revenue = np.cumsum(np.concatenate(([self._checkpoint_revenue[checkpoint]], revenues)))
+        cumulative_counts = self._checkpoint_counts[checkpoint] + np.cumsum(
+            np.concatenate((np.zeros((1, len(ACTIONS)), dtype=np.int64),
+                            actions[:, None] == np.arange(len(ACTIONS))[None, :])), axis=0)
+        soc_before = np.concatenate(([soc], socs))
+
+        # Checkpoints at the day boundaries of the tail (the start of the tail included)
+        boundaries = np.arange(0, len(tail) + 1, self.checkpoint_hours)
+        self._checkpoint_soc = np.concatenate((self._checkpoint_soc[:checkpoint], soc_before[boundaries]))
+        self._checkpoint_revenue = np.concatenate((self._checkpoint_revenue[:checkpoint],
+                                                   cumulative_revenue[boundaries]))
+        self._checkpoint_counts = np.concatenate((self._checkpoint_counts[:checkpoint],
+                                                  cumulative_counts[boundaries]))
+
+        self._final_soc = soc_before[-1]
+        self._total_revenue = cumulative_revenue[-1]
+        self._action_counts = cumulative_counts[-1]
+
+
+def first_changed_hour(old_prices: np.ndarray, new_prices: np.ndarray) -> int:
+    """
+    First hour at which two versions of a price series differ, including a change of length.
+
+    Parameters:
+    - old_prices: Previous price series
+    - new_prices: New price series
+
+    Returns:
+    - Index of the first differing hour, or the common length if one series extends the other
+    """
+    common = min(len(old_prices), len(new_prices))
+    differing = np.flatnonzero(old_prices[:common] != new_prices[:common])
+    if len(differing):
+        return int(differing[0])
+    return common
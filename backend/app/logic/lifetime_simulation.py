@@ -0,0 +1,230 @@
+import numpy as np
+import json
+from typing import Dict, List, Any, Optional, Type
+
+from app.logic.battery_optimization import BatteryOptimizer
+
+# State of health (share of the nominal energy capacity) at which the battery reaches end of life
+END_OF_LIFE_SOH = 0.8
+
+# Number of capacity points at which the optimizer is actually run
+DEFAULT_CAPACITY_POINTS = 3
+
+# Lower bound of the simulated SOH range, to keep the degraded battery model meaningful
+MIN_SIMULATED_SOH = 0.3
+
+
+class LifetimeSimulator:
+    """
+    Multi-year simulation of a battery whose usable energy capacity fades every year.
+
+    Instead of running the optimizer once per year, it is run on a small grid of
+    state-of-health (SOH) values over the same price year. The yearly revenue and cycle
+    count are then interpolated from that capacity-to-revenue curve while the SOH is
+    updated year by year from calendar and cycling ageing.
+    """
+
+    def __init__(self,
+                 optimizer_config: Optional[Dict[str, Any]] = None,
+                 years: int = 20,
+                 calendar_lifetime: Optional[int] = 20,
+                 cycling_lifetime: Optional[int] = 6000,
+                 end_of_life_soh: float = END_OF_LIFE_SOH,
+                 capacity_points: int = DEFAULT_CAPACITY_POINTS,
+                 optimizer_class: Type[BatteryOptimizer] = BatteryOptimizer):
+        """
+        Initialize the lifetime simulator.
+
+        Parameters:
+        - optimizer_config: Keyword arguments for the optimizer (BatteryOptimizer parameters)
+        - years: Number of operating years to simulate
+        - calendar_lifetime: Years until end of life from calendar ageing alone (None disables it)
+        - cycling_lifetime: Full equivalent cycles until end of life (None disables it)
+        - end_of_life_soh: State of health reached at the end of the calendar/cycling lifetime
+        - capacity_points: Number of SOH values at which the optimizer is run
+        - optimizer_class: Optimizer used for the yearly dispatch
+        """
+        if capacity_points < 2:
+            raise ValueError("capacity_points must be at least 2")
+
+        self.optimizer_config = dict(optimizer_config or {})
+        self.years = years
+        self.calendar_lifetime = calendar_lifetime
+        self.cycling_lifetime = cycling_lifetime
+        self.end_of_life_soh = end_of_life_soh
+        self.capacity_points = capacity_points
+        self.optimizer_class = optimizer_class
+
+        self.nominal_energy_capacity = self.optimizer_class(**self.optimizer_config).battery_energy_capacity
+
+    @classmethod
+    def from_project(cls, project: Dict[str, Any], **kwargs) -> 'LifetimeSimulator':
+        """
+        Create a simulator from a project record (ProjectBase fields).
+        Missing technical parameters fall back to the optimizer defaults.
+
+        Parameters:
+        - project: Project dictionary as stored in the 'projects' table
+        - kwargs: Additional LifetimeSimulator arguments
+
+        Returns:
+        - LifetimeSimulator instance
+        """
+        config = optimizer_config_from_project(project)
+        if project.get('calendar_lifetime'):
+            kwargs.setdefault('calendar_lifetime', project['calendar_lifetime'])
+            kwargs.setdefault('years', project['calendar_lifetime'])
+        if project.get('cycling_lifetime'):
+            kwargs.setdefault('cycling_lifetime', project['cycling_lifetime'])
+        return cls(optimizer_config=config, **kwargs)
+
+    def simulate(self, prices: Optional[List[float]] = None, datetimes: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Simulate the battery over its operating years.
+        The same price year is used for every operating year.
+
+        Parameters:
+        - prices: Optional list of hourly prices (fetched from the default CSV if omitted)
+        - datetimes: Optional list of datetime strings corresponding to the prices
+
+        Returns:
+        - Dictionary with the yearly results and summary statistics
+        """
+        if prices is None:
+            prices, datetimes = self.optimizer_class(**self.optimizer_config)._fetch_prices_from_csv()
+
+        soh_grid, revenue_curve, cycle_curve = self._capacity_curve(prices, datetimes)
+
+        calendar_fade, cycle_fade = self._fade_rates()
+
+        soh = 1.0
+        end_of_life_year = None
+        yearly = []
+
+        for year in range(1, self.years + 1):
+            revenue = float(np.interp(soh, soh_grid, revenue_curve))
+            cycles = float(np.interp(soh, soh_grid, cycle_curve))
+
+            yearly.append({
+                'year': year,
+                'soh': soh,
+                'energy_capacity': soh * self.nominal_energy_capacity,
+                'revenue': revenue,
+                'cycles': cycles
+            })
+
+            soh = max(soh - calendar_fade - cycles * cycle_fade, 0.0)
+            if end_of_life_year is None and soh <= self.end_of_life_soh:
+                end_of_life_year = year
+
+        return {
+            'years': yearly,
+            'summary': {
+                'total_revenue': float(sum(entry['revenue'] for entry in yearly)),
+                'final_soh': soh,
+                'end_of_life_year': end_of_life_year,
+                'optimizer_runs': len(soh_grid),
+                'capacity_curve': {
+                    'soh': soh_grid.tolist(),
+                    'revenue': revenue_curve.tolist(),
+                    'cycles': cycle_curve.tolist()
+                },
+                'parameters': {
+                    'optimizer': json.loads(self.optimizer_class(**self.optimizer_config).to_json()),
+                    'years': self.years,
+                    'calendar_lifetime': self.calendar_lifetime,
+                    'cycling_lifetime': self.cycling_lifetime,
+                    'end_of_life_soh': self.end_of_life_soh
+                }
+            }
+        }
+
+    def _fade_rates(self) -> tuple:
+        """
+        Linear fade rates that reach end_of_life_soh at the calendar or cycling lifetime.
+
+        Returns:
+        - Tuple of (SOH fade per year, SOH fade per full equivalent cycle)
+        """
+        fade_to_eol = 1 - self.end_of_life_soh
+        calendar_fade = fade_to_eol / self.calendar_lifetime if self.calendar_lifetime else 0.0
+        cycle_fade = fade_to_eol / self.cycling_lifetime if self.cycling_lifetime else 0.0
+        return calendar_fade, cycle_fade
+
+    def _capacity_curve(self, prices: List[float], datetimes: Optional[List[str]]) -> tuple:
+        """
+        Run the optimizer at a few SOH values to build the capacity-to-revenue curve.
+        The run at full health comes first; its cycle count bounds how far the SOH can
+        fall within the simulated years, which sets the low end of the grid.
+
+        Parameters:
+        - prices: Hourly prices of the simulated price year
+        - datetimes: Optional datetimes of the hours
+
+        Returns:
+        - Tuple of (soh grid, yearly revenue per SOH, full equivalent cycles per SOH),
+          each sorted by increasing SOH as required by np.interp
+        """
+        full_health = self._run_at_soh(1.0, prices, datetimes)
+
+        calendar_fade, cycle_fade = self._fade_rates()
+        lowest_soh = 1.0 - self.years * (calendar_fade + full_health[1] * cycle_fade)
+        lowest_soh = min(max(lowest_soh, MIN_SIMULATED_SOH), self.end_of_life_soh)
+
+        soh_grid = np.linspace(lowest_soh, 1.0, self.capacity_points)
+        curve = [self._run_at_soh(soh, prices, datetimes) for soh in soh_grid[:-1]] + [full_health]
+
+        revenue_curve = np.array([point[0] for point in curve])
+        cycle_curve = np.array([point[1] for point in curve])
+
+        return soh_grid, revenue_curve, cycle_curve
+
+    def _run_at_soh(self, soh: float, prices: List[float], datetimes: Optional[List[str]]) -> tuple:
+        """
+        Run the optimizer with the energy capacity scaled to a state of health.
+
+        Parameters:
+        - soh: State of health (share of the nominal energy capacity)
+        - prices: Hourly prices of the simulated price year
+        - datetimes: Optional datetimes of the hours
+
+        Returns:
+        - Tuple of (yearly revenue, full equivalent cycles)
+        """
+        config = dict(self.optimizer_config)
+        config['battery_energy_capacity'] = soh * self.nominal_energy_capacity
+        result = self.optimizer_class(**config).optimize(prices, datetimes)
+
+        discharged = sum(row['quantity'] for row in result['results'] if row['action'] == 'discharge')
+
+        return result['summary']['total_revenue'], discharged / config['battery_energy_capacity']
+
+
+def optimizer_config_from_project(project: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map the technical parameters of a project record onto BatteryOptimizer arguments.
+    SOC limits are stored in percent in the database and converted to fractions.
+
+    Parameters:
+    - project: Project dictionary as stored in the 'projects' table
+
+    Returns:
+    - Dictionary of BatteryOptimizer keyword arguments (only the fields that are set)
+    """
+    mapping = {
+        'nominal_power_capacity': 'battery_power_capacity',
+        'nominal_energy_capacity': 'battery_energy_capacity',
+        'max_charging_power': 'max_charging',
+        'max_discharging_power': 'max_discharging'
+    }
+
+    config = {}
+    for field, parameter in mapping.items():
+        if project.get(field) is not None:
+            config[parameter] = float(project[field])
+
+    for field in ('min_soc', 'max_soc'):
+        if project.get(field) is not None:
+            config[field] = float(project[field]) / 100
+
+    return config
@@ -0,0 +1,216 @@
+import numpy as np
+import json
+from typing import Dict, List, Any, Optional, Tuple
+from scipy import sparse
+from scipy.optimize import linprog
+
+from app.logic.battery_optimization import BatteryOptimizer
+
+# Quantities below this threshold (MW) are treated as zero when labelling actions
+QUANTITY_TOLERANCE = 1e-6
+
+
+class PerfectForesightOptimizer(BatteryOptimizer):
+    """
+    Linear-programming formulation of battery arbitrage with perfect price foresight.
+
+    Uses the same parameters as BatteryOptimizer and gives an upper bound on the revenue any
+    dispatch heuristic can reach. The model is solved with HiGHS through SciPy, either over the
+    full horizon at once or in rolling windows (e.g. solve 48 h, commit the first 24 h).
+    """
+
+    def __init__(self,
+                 initial_soc: float = 0.4,
+                 battery_power_capacity: float = 10,
+                 battery_energy_capacity: float = 40,
+                 min_soc: float = 0.2,
+                 max_soc: float = 0.8,
+                 max_charging: float = 7,
+                 max_discharging: float = 10,
+                 window: Optional[int] = 48,
+                 commit: int = 24):
+        """
+        Initialize the LP optimizer.
+
+        Parameters:
+        - initial_soc, battery_power_capacity, battery_energy_capacity, min_soc, max_soc,
+          max_charging, max_discharging: See BatteryOptimizer
+        - window: Hours optimized per solve (None solves the whole horizon at once)
+        - commit: Hours of each window that are kept before the window rolls forward
+        """
+        super().__init__(initial_soc, battery_power_capacity, battery_energy_capacity,
+                         min_soc, max_soc, max_charging, max_discharging)
+
+        if window is not None and not 0 < commit <= window:
+            raise ValueError("commit must be between 1 and window")
+        self.window = window
+        self.commit = commit
+
+        # Sparse constraint matrices are identical for every window of the same length
+        self._models = {}
+
+    def optimize(self, prices: Optional[List[float]] = None, datetimes: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Solve the arbitrage LP on the provided price data.
+        If prices are not provided, they will be fetched from the default CSV file.
+
+        Parameters:
+        - prices: Optional list of hourly electricity prices
+        - datetimes: Optional list of datetime strings corresponding to the prices
+
+        Returns:
+        - Dictionary containing optimization results and summary statistics
+          (same layout as BatteryOptimizer.optimize)
+        """
+        if prices is None:
+            prices, datetimes = self._fetch_prices_from_csv()
+
+        prices_array = np.asarray(prices, dtype=float)
+        n_hours = len(prices_array)
+
+        window = n_hours if self.window is None else self.window
+        commit = n_hours if self.window is None else self.commit
+
+        charge = np.zeros(n_hours)
+        discharge = np.zeros(n_hours)
+        energy = np.zeros(n_hours)
+
+        # Roll the window forward, carrying the committed SOC into the next solve
+        stored_energy = self.initial_soc * self.battery_energy_capacity
+        solves = 0
+        start = 0
+        while start < n_hours:
+            end = min(start + window, n_hours)
+            keep = min(commit, end - start)
+
+            c, d, s = self._solve_window(prices_array[start:end], stored_energy)
+            charge[start:start + keep] = c[:keep]
+            discharge[start:start + keep] = d[:keep]
+            energy[start:start + keep] = s[:keep]
+
+            stored_energy = s[keep - 1]
+            start += keep
+            solves += 1
+
+        return self._build_response(prices_array, datetimes, charge, discharge, energy, solves)
+
+    def _get_model(self, horizon: int) -> Tuple[sparse.csr_matrix, np.ndarray]:
+        """
+        Build (or reuse) the sparse equality constraints and bounds for a window.
+
+        Variables are ordered as [charge (MW), discharge (MW), stored energy (MWh)] per hour.
+        The energy balance of hour t is: s_t - s_{t-1} - c_t + d_t = 0.
+
+        Parameters:
+        - horizon: Number of hours in the window
+
+        Returns:
+        - Tuple of (A_eq, bounds)
+        """
+        if horizon not in self._models:
+            identity = sparse.identity(horizon, format='csr')
+            shift = sparse.eye(horizon, k=-1, format='csr')
+
+            a_eq = sparse.hstack([-identity, identity, identity - shift], format='csr')
+
+            bounds = np.repeat([[0, self.max_charging],
+                                [0, self.max_discharging],
+                                [self.min_soc * self.battery_energy_capacity,
+                                 self.max_soc * self.battery_energy_capacity]], horizon, axis=0)
+
+            self._models[horizon] = (a_eq, bounds)
+
+        return self._models[horizon]
+
+    def _solve_window(self, prices: np.ndarray, stored_energy: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Solve the LP for one window.
+
+        Parameters:
+        - prices: Prices of the hours in the window
+        - stored_energy: Energy stored at the start of the window in MWh
+
+        Returns:
+        - Tuple of (charge, discharge, stored energy) arrays for the window
+        """
+        horizon = len(prices)
+        a_eq, bounds = self._get_model(horizon)
+
+        # Minimize the cost of charging minus the revenue from discharging
+        cost = np.concatenate([prices, -prices, np.zeros(horizon)])
+
+        b_eq = np.zeros(horizon)
+        b_eq[0] = stored_energy
+
+        solution = linprog(cost, A_eq=a_eq, b_eq=b_eq, bounds=bounds, method='highs')
+        if solution.status != 0:
+            raise RuntimeError(f"LP solve failed: {solution.message}")
+
+        x = solution.x
+        return x[:horizon], x[horizon:2 * horizon], x[2 * horizon:]
+
+    def _build_response(self, prices_array: np.ndarray, datetimes: Optional[List[str]],
+                        charge: np.ndarray, discharge: np.ndarray, energy: np.ndarray,
+                        solves: int) -> Dict[str, Any]:
+        """
+        Convert the LP solution into the BatteryOptimizer response format.
+
+        Parameters:
+        - prices_array: Array of hourly prices
+        - datetimes: Optional datetimes of the hours
+        - charge: Charging power per hour in MW
+        - discharge: Discharging power per hour in MW
+        - energy: Stored energy at the end of each hour in MWh
+        - solves: Number of LP solves performed
+
+        Returns:
+        - Dictionary containing optimization results and summary statistics
+        """
+        revenue = (discharge - charge) * prices_array
+        cumulative_revenue = np.cumsum(revenue)
+        soc = energy / self.battery_energy_capacity
+
+        # Label each hour by its net flow
+        net = discharge - charge
+        actions = np.where(net > QUANTITY_TOLERANCE, 'discharge',
+                           np.where(net < -QUANTITY_TOLERANCE, 'charge', 'hold'))
+
+        results = []
+        for i in range(len(prices_array)):
+            result = {
+                'hour': i,
+                'price': float(prices_array[i]),
+                'action': str(actions[i]),
+                'quantity': float(abs(net[i])),
+                'revenue': float(revenue[i]),
+                'soc': float(soc[i]),
+                'cumulative_revenue': float(cumulative_revenue[i])
+            }
+            if datetimes is not None and i < len(datetimes):
+                result['datetime'] = datetimes[i]
+            results.append(result)
+
+        labels, counts = np.unique(actions, return_counts=True)
+
+        return {
+            'results': results,
+            'summary': {
+                'total_revenue': float(revenue.sum()),
+                'action_counts': {str(label): int(count) for label, count in zip(labels, counts)},
+                'final_soc': float(soc[-1]) if len(soc) else float(self.initial_soc),
+                'solves': solves,
+                'parameters': json.loads(self.to_json())
+            }
+        }
+
+    def to_json(self) -> str:
+        """
+        Convert the optimizer configuration to a JSON string.
+
+        Returns:
+        - JSON string representation of the optimizer configuration
+        """
+        config = json.loads(super().to_json())
+        config['window'] = self.window
+        config['commit'] = self.commit
+        return json.dumps(config)
@@ -0,0 +1,284 @@
+import pandas as pd
+import numpy as np
+import os
+import re
+from functools import lru_cache
+from typing import List, Optional
+
+# Directory holding the market data files shipped with the backend
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# Bidding zone of the day-ahead price file written by data_preprocessing.py
+DEFAULT_ZONE = 'DE-LU'
+
+# Day-ahead price files by bidding zone (columns: datetime, price_eur_mwh).
+# Zones not listed here are read from DAY_AHEAD_FILE_PATTERN when such a file is present.
+DAY_AHEAD_FILES = {
+    DEFAULT_ZONE: 'wholesale_energy_prices.csv'
+}
+DAY_AHEAD_FILE_PATTERN = 'day_ahead_prices_{zone}.csv'
+
+# Characters allowed in a bidding zone name (zones become part of file names)
+ZONE_PATTERN = re.compile(r'[A-Za-z0-9_-]+')
+
+# Bidding zone of each country, keyed by the lower-case country name or ISO code used in projects
+COUNTRY_ZONES = {
+    'germany': 'DE-LU', 'de': 'DE-LU',
+    'luxembourg': 'DE-LU', 'lu': 'DE-LU',
+    'austria': 'AT', 'at': 'AT',
+    'belgium': 'BE', 'be': 'BE',
+    'france': 'FR', 'fr': 'FR',
+    'netherlands': 'NL', 'nl': 'NL',
+    'poland': 'PL', 'pl': 'PL',
+    'spain': 'ES', 'es': 'ES',
+    'portugal': 'PT', 'pt': 'PT',
+    'switzerland': 'CH', 'ch': 'CH',
+    'czech republic': 'CZ', 'czechia': 'CZ', 'cz': 'CZ',
+    'finland': 'FI', 'fi': 'FI',
+    'great britain': 'GB', 'united kingdom': 'GB', 'uk': 'GB', 'gb': 'GB'
+}
+
+# Reserve capacity products are auctioned in 4-hour blocks (00-04, 04-08, ..., 20-24)
+BLOCK_HOURS = 4
+
+# Reserve capacity products supported by the multi-market engine.
+# Each entry maps the product to its result file, product name prefix,
+# German price column and the direction of power it reserves.
+RESERVE_PRODUCTS = {
+    'FCR': {
+        'market': 'FCR',
+        'prefix': 'NEGPOS',
+        'price_column': 'GERMANY_SETTLEMENTCAPACITY_PRICE_[EUR/MW]',
+        'price_per_block': True,
+        'direction': 'symmetric'
+    },
+    'aFRR_POS': {
+        'market': 'aFRR',
+        'prefix': 'POS',
+        'price_column': 'GERMANY_AVERAGE_CAPACITY_PRICE_[(EUR/MW)/h]',
+        'price_per_block': False,
+        'direction': 'up'
+    },
+    'aFRR_NEG': {
+        'market': 'aFRR',
+        'prefix': 'NEG',
+        'price_column': 'GERMANY_AVERAGE_CAPACITY_PRICE_[(EUR/MW)/h]',
+        'price_per_block': False,
+        'direction': 'down'
+    },
+    'mFRR_POS': {
+        'market': 'mFRR',
+        'prefix': 'POS',
+        'price_column': 'GERMANY_AVERAGE_CAPACITY_PRICE_[(EUR/MW)/h]',
+        'price_per_block': False,
+        'direction': 'up'
+    },
+    'mFRR_NEG': {
+        'market': 'mFRR',
+        'prefix': 'NEG',
+        'price_column': 'GERMANY_AVERAGE_CAPACITY_PRICE_[(EUR/MW)/h]',
+        'price_per_block': False,
+        'direction': 'down'
+    }
+}
+
+
+@lru_cache(maxsize=None)
+def _read_capacity_market(market: str, year: int) -> pd.DataFrame:
+    """
+    Read a capacity market result file into a tidy frame.
+    Results are cached, since parsing the Excel files takes a few seconds.
+
+    Parameters:
+    - market: Market name as used in the file name ('FCR', 'aFRR', 'mFRR')
+    - year: Delivery year
+
+    Returns:
+    - DataFrame with columns date, block, product and one column per price field
+    """
+    file = os.path.join(DATA_DIR, f'RESULT_OVERVIEW_CAPACITY_MARKET_{market}_{year}-01-01_{year}-12-31.xlsx')
+    df = pd.read_excel(file)
+
+    # FCR files name the product column differently from the aFRR/mFRR files
+    product_column = 'PRODUCT' if 'PRODUCT' in df.columns else 'PRODUCTNAME'
+
+    # Product names look like 'POS_04_08': direction prefix, start hour, end hour
+    parts = df[product_column].astype(str).str.rsplit('_', n=2, expand=True)
+    df['product'] = parts[0]
+    df['block'] = parts[1].astype(int) // BLOCK_HOURS
+    df['date'] = pd.to_datetime(df['DATE_FROM']).dt.normalize()
+
+    return df
+
+
+def load_capacity_prices(product: str, year: int) -> pd.DataFrame:
+    """
+    Load the hourly capacity price of a reserve product for every 4-hour block of a year.
+
+    Parameters:
+    - product: Key of RESERVE_PRODUCTS (e.g. 'FCR', 'aFRR_POS')
+    - year: Delivery year
+
+    Returns:
+    - DataFrame with columns date, block and price (EUR/MW per hour of delivery)
+    """
+    if product not in RESERVE_PRODUCTS:
+        raise ValueError(f"Unknown reserve product: {product}")
+    spec = RESERVE_PRODUCTS[product]
+
+    df = _read_capacity_market(spec['market'], year)
+    df = df[df['product'] == spec['prefix']]
+
+    # Missing tenders are reported as '-' in the result files
+    price = pd.to_numeric(df[spec['price_column']], errors='coerce')
+    if spec['price_per_block']:
+        price = price / BLOCK_HOURS
+
+    prices = pd.DataFrame({'date': df['date'], 'block': df['block'], 'price': price})
+
+    # Keep the first settled tender per block (FCR lists several tenders per day)
+    prices = prices.dropna(subset=['price']).drop_duplicates(subset=['date', 'block'])
+
+    return prices.reset_index(drop=True)
+
+
+def capacity_price_matrix(datetimes, products: Optional[List[str]] = None) -> np.ndarray:
+    """
+    Align reserve capacity prices with an hourly time axis.
+
+    Parameters:
+    - datetimes: Sequence of hourly timestamps (strings or datetimes)
+    - products: Reserve products to include (defaults to all RESERVE_PRODUCTS)
+
+    Returns:
+    - Array of shape (len(datetimes), len(products)) with capacity prices in EUR/MW/h.
+      Hours without a settled auction are set to 0.
+    """
+    if products is None:
+        products = list(RESERVE_PRODUCTS)
+
+    timestamps = pd.to_datetime(pd.Series(datetimes))
+    hours = pd.DataFrame({
+        'date': timestamps.dt.normalize(),
+        'block': timestamps.dt.hour // BLOCK_HOURS
+    })
+
+    matrix = np.zeros((len(hours), len(products)))
+    years = timestamps.dt.year.unique()
+
+    for j, product in enumerate(products):
+        frames = []
+        for year in years:
+            try:
+                frames.append(load_capacity_prices(product, int(year)))
+            except FileNotFoundError:
+                # No auction results for this year: the product earns nothing
+                continue
+        if not frames:
+            continue
+
+        prices = pd.concat(frames, ignore_index=True)
+        merged = hours.merge(prices, on=['date', 'block'], how='left')
+        matrix[:, j] = merged['price'].fillna(0).values
+
+    return matrix
+
+
+def day_ahead_price_file(zone: str) -> str:
+    """
+    Path of the day-ahead price file of a bidding zone.
+
+    Parameters:
+    - zone: Bidding zone (e.g. 'DE-LU')
+
+    Returns:
+    - File path (the file may not exist)
+    """
+    if not ZONE_PATTERN.fullmatch(zone):
+        raise ValueError(f"Invalid bidding zone: {zone!r}")
+    return os.path.join(DATA_DIR, DAY_AHEAD_FILES.get(zone, DAY_AHEAD_FILE_PATTERN.format(zone=zone)))
+
+
+def available_zones() -> List[str]:
+    """
+    List the bidding zones with a day-ahead price file.
+
+    Returns:
+    - Sorted list of zones
+    """
+    prefix, suffix = DAY_AHEAD_FILE_PATTERN.split('{zone}')
+    zones = {zone for zone in DAY_AHEAD_FILES if os.path.exists(day_ahead_price_file(zone))}
+    zones.update(name[len(prefix):-len(suffix)] for name in os.listdir(DATA_DIR)
+                 if name.startswith(prefix) and name.endswith(suffix)
+                 and ZONE_PATTERN.fullmatch(name[len(prefix):-len(suffix)]))
+    return sorted(zones)
+
+
+def zone_for_country(country: Optional[str]) -> Optional[str]:
+    """
+    Bidding zone of a country.
+
+    Parameters:
+    - country: Country name or ISO code, as entered for a project
+
+    Returns:
+    - Bidding zone, or None if the country is unknown
+    """
+    if not country:
+        return None
+    return COUNTRY_ZONES.get(country.strip().lower())
+
+
+@lru_cache(maxsize=None)
+def _read_day_ahead_prices(zone: str = DEFAULT_ZONE) -> pd.DataFrame:
+    """
+    Read the day-ahead price file of a bidding zone, once per zone.
+
+    Parameters:
+    - zone: Bidding zone
+
+    Returns:
+    - DataFrame with columns datetime and price_eur_mwh
+    """
+    path = day_ahead_price_file(zone)
+    if not os.path.exists(path):
+        raise ValueError(f"No day-ahead prices available for bidding zone {zone}")
+
+    df = pd.read_csv(path)
+    df['datetime'] = pd.to_datetime(df['datetime'])
+    return df
+
+
+def available_price_years(zone: str = DEFAULT_ZONE) -> List[int]:
+    """
+    List the years covered by the day-ahead price file of a bidding zone.
+
+    Parameters:
+    - zone: Bidding zone
+
+    Returns:
+    - Sorted list of years
+    """
+    return sorted(int(year) for year in _read_day_ahead_prices(zone)['datetime'].dt.year.unique())
+
+
+def load_day_ahead_prices(year: int, zone: str = DEFAULT_ZONE) -> tuple:
+    """
+    Load the hourly day-ahead prices of one year.
+
+    Parameters:
+    - year: Year to load
+    - zone: Bidding zone
+
+    Returns:
+    - Tuple of (prices, datetimes) in the format expected by BatteryOptimizer.optimize
+    """
+    df = _read_day_ahead_prices(zone)
+    df = df[df['datetime'].dt.year == year]
+    if df.empty:
+        raise ValueError(f"No day-ahead prices available for {zone} in {year}")
+
+    prices = df['price_eur_mwh'].values
+    datetimes = df['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S').tolist()
+
+    return prices, datetimes
@@ -0,0 +1,295 @@
+import pandas as pd
+import numpy as np
+import json
+from typing import Dict, List, Any, Optional
+
+from app.logic.battery_optimization import BatteryOptimizer
+from app.logic.market_data import RESERVE_PRODUCTS, BLOCK_HOURS, capacity_price_matrix
+
+# Hours of full activation the battery must be able to sustain for each committed MW
+RESERVE_DURATIONS = {
+    'FCR': 0.25,   # 15-minute criterion for energy-limited FCR providers
+    'aFRR': 1.0,
+    'mFRR': 1.0
+}
+
+# Minimum bid size accepted in the German reserve auctions (MW)
+MIN_BID_MW = 1.0
+
+
+class MultiMarketOptimizer(BatteryOptimizer):
+    """
+    Co-optimizes day-ahead arbitrage with reserve capacity (FCR, aFRR, mFRR) in 4-hour blocks.
+
+    For every block the battery either offers part of its power as one reserve product or
+    keeps it for arbitrage. The reserved power is removed from the arbitrage limits and an
+    SOC buffer is kept so that the reserve can be fully activated. Arbitrage in the remaining
+    headroom uses the same heuristic as BatteryOptimizer. Activation energy is not settled.
+    """
+
+    def __init__(self,
+                 initial_soc: float = 0.4,
+                 battery_power_capacity: float = 10,
+                 battery_energy_capacity: float = 40,
+                 min_soc: float = 0.2,
+                 max_soc: float = 0.8,
+                 max_charging: float = 7,
+                 max_discharging: float = 10,
+                 reserve_products: Optional[List[str]] = None,
+                 reserve_share: float = 1.0):
+        """
+        Initialize the multi-market optimizer.
+
+        Parameters:
+        - initial_soc, battery_power_capacity, battery_energy_capacity, min_soc, max_soc,
+          max_charging, max_discharging: See BatteryOptimizer
+        - reserve_products: Reserve products to consider (defaults to all RESERVE_PRODUCTS)
+        - reserve_share: Maximum share of the power capacity offered as reserve (0-1)
+        """
+        super().__init__(initial_soc, battery_power_capacity, battery_energy_capacity,
+                         min_soc, max_soc, max_charging, max_discharging)
+
+        self.reserve_products = list(reserve_products) if reserve_products is not None else list(RESERVE_PRODUCTS)
+        for product in self.reserve_products:
+            if product not in RESERVE_PRODUCTS:
+                raise ValueError(f"Unknown reserve product: {product}")
+        self.reserve_share = reserve_share
+
+    def optimize(self, prices: Optional[List[float]] = None, datetimes: Optional[List[str]] = None,
+                 capacity_prices: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Run the stacked-revenue optimization.
+
+        Parameters:
+        - prices: Optional list of hourly day-ahead prices (fetched from the default CSV if omitted)
+        - datetimes: Optional list of datetime strings corresponding to the prices
+        - capacity_prices: Optional array of shape (hours, len(reserve_products)) with capacity
+          prices in EUR/MW/h. Loaded from the auction result files when omitted.
+
+        Returns:
+        - Dictionary containing hourly results and summary statistics, including the
+          revenue split between arbitrage and each reserve product
+        """
+        if prices is None:
+            prices, datetimes = self._fetch_prices_from_csv()
+
+        prices_array = np.asarray(prices, dtype=float)
+        n_hours = len(prices_array)
+
+        if capacity_prices is None:
+            if datetimes is None:
+                raise ValueError("datetimes are required to load capacity prices")
+            capacity_prices = capacity_price_matrix(datetimes, self.reserve_products)
+        capacity_prices = np.asarray(capacity_prices, dtype=float)
+
+        block_starts = self._block_starts(n_hours, datetimes)
+        block_products = self._allocate_reserves(prices_array, capacity_prices, block_starts)
+
+        # Map every hour to the block it belongs to
+        hour_block = np.repeat(np.arange(len(block_starts)), np.diff(np.append(block_starts, n_hours)))
+
+        soc = self.initial_soc
+        results = []
+        reserve_mw = 0.0
+        product = None
+
+        for i in range(n_hours):
+            # Size the reserve commitment at the start of each block from the actual SOC
+            if i == block_starts[hour_block[i]]:
+                product_index = block_products[hour_block[i]]
+                product = self.reserve_products[product_index] if product_index >= 0 else None
+                reserve_mw = self._reserve_capacity(product, soc)
+                if reserve_mw < MIN_BID_MW:
+                    product, product_index, reserve_mw = None, -1, 0.0
+                limits = self._hourly_limits(product, reserve_mw)
+
+            step = self._dispatch_step(i, soc, prices_array, *limits)
+            soc = step['soc']
+
+            reserve_revenue = 0.0
+            if product is not None:
+                reserve_revenue = reserve_mw * capacity_prices[i, product_index]
+
+            result = {
+                'hour': i,
+                'price': float(prices_array[i]),
+                'action': step['action'],
+                'quantity': float(step['quantity']),
+                'arbitrage_revenue': float(step['revenue']),
+                'reserve_product': product,
+                'reserve_mw': float(reserve_mw),
+                'reserve_revenue': float(reserve_revenue),
+                'revenue': float(step['revenue'] + reserve_revenue),
+                'soc': float(soc)
+            }
+
+            if datetimes is not None and i < len(datetimes):
+                result['datetime'] = datetimes[i]
+
+            results.append(result)
+
+        revenue = np.array([result['revenue'] for result in results])
+        for result, cumulative in zip(results, np.cumsum(revenue)):
+            result['cumulative_revenue'] = float(cumulative)
+
+        action_counts = {}
+        reserve_revenue_by_product = {product: 0.0 for product in self.reserve_products}
+        reserve_hours = {product: 0 for product in self.reserve_products}
+        for result in results:
+            action_counts[result['action']] = action_counts.get(result['action'], 0) + 1
+            if result['reserve_product'] is not None:
+                reserve_revenue_by_product[result['reserve_product']] += result['reserve_revenue']
+                reserve_hours[result['reserve_product']] += 1
+
+        arbitrage_revenue = sum(result['arbitrage_revenue'] for result in results)
+        reserve_revenue = sum(reserve_revenue_by_product.values())
+
+        return {
+            'results': results,
+            'summary': {
+                'total_revenue': float(arbitrage_revenue + reserve_revenue),
+                'arbitrage_revenue': float(arbitrage_revenue),
+                'reserve_revenue': float(reserve_revenue),
+                'reserve_revenue_by_product': reserve_revenue_by_product,
+                'reserve_hours': reserve_hours,
+                'action_counts': action_counts,
+                'final_soc': float(soc),
+                'parameters': json.loads(self.to_json())
+            }
+        }
+
+    def _block_starts(self, n_hours: int, datetimes: Optional[List[str]]) -> np.ndarray:
+        """
+        Find the index of the first hour of every 4-hour reserve block.
+
+        Parameters:
+        - n_hours: Number of hours in the series
+        - datetimes: Optional datetimes of the hours; without them the series is assumed to start at midnight
+
+        Returns:
+        - Sorted array of block start indices (always starting with 0)
+        """
+        if datetimes is None:
+            return np.arange(0, n_hours, BLOCK_HOURS)
+
+        timestamps = pd.to_datetime(pd.Series(datetimes[:n_hours]))
+        block_id = (timestamps.dt.normalize().values.astype('datetime64[D]').astype(np.int64) * (24 // BLOCK_HOURS)
+                    + (timestamps.dt.hour // BLOCK_HOURS).values)
+        starts = np.flatnonzero(np.diff(block_id) != 0) + 1
+
+        return np.concatenate(([0], starts))
+
+    def _allocate_reserves(self, prices_array: np.ndarray, capacity_prices: np.ndarray,
+                           block_starts: np.ndarray) -> np.ndarray:
+        """
+        Pick the most valuable reserve product for every block, or none if arbitrage pays more.
+
+        The value of 1 MW of reserve is its capacity price. Its opportunity cost is the arbitrage
+        value of the same MW: the deviation of each hourly price from the 24-hour centered mean,
+        scaled by the share of hours the battery can actually trade at full power. Up reserves
+        only forgo discharging above the mean, down reserves only forgo charging below it.
+
+        Parameters:
+        - prices_array: Array of hourly day-ahead prices
+        - capacity_prices: Array of shape (hours, products) with capacity prices in EUR/MW/h
+        - block_starts: Index of the first hour of every block
+
+        Returns:
+        - Array with the index of the chosen product per block (-1 for no reserve)
+        """
+        if not self.reserve_products:
+            return np.full(len(block_starts), -1)
+
+        mean_price = pd.Series(prices_array).rolling(24, center=True, min_periods=1).mean().values
+        deviation = prices_array - mean_price
+
+        # Share of the day the battery can trade at full power in one direction
+        usable_energy = (self.max_soc - self.min_soc) * self.battery_energy_capacity
+        duty = min(1.0, usable_energy / (max(self.max_charging, self.max_discharging) * 12))
+
+        opportunity = {
+            'symmetric': np.abs(deviation),
+            'up': np.clip(deviation, 0, None),
+            'down': np.clip(-deviation, 0, None)
+        }
+
+        net_value = np.empty((len(prices_array), len(self.reserve_products)))
+        for j, product in enumerate(self.reserve_products):
+            direction = RESERVE_PRODUCTS[product]['direction']
+            net_value[:, j] = capacity_prices[:, j] - duty * opportunity[direction]
+
+        # Sum the hourly values of each block in one pass
+        block_value = np.add.reduceat(net_value, block_starts, axis=0)
+
+        best = np.argmax(block_value, axis=1)
+        best_value = block_value[np.arange(len(block_starts)), best]
+
+        return np.where(best_value > 0, best, -1)
+
+    def _reserve_capacity(self, product: Optional[str], soc: float) -> float:
+        """
+        Size the reserve commitment that can be honoured from the current SOC.
+
+        Parameters:
+        - product: Reserve product for the block (None for no reserve)
+        - soc: State of charge at the start of the block
+
+        Returns:
+        - Reserved power in MW
+        """
+        if product is None:
+            return 0.0
+
+        direction = RESERVE_PRODUCTS[product]['direction']
+        duration = RESERVE_DURATIONS[RESERVE_PRODUCTS[product]['market']]
+        capacity = self.reserve_share * self.battery_power_capacity
+
+        if direction in ('up', 'symmetric'):
+            capacity = min(capacity, self.max_discharging,
+                           max(soc - self.min_soc, 0) * self.battery_energy_capacity / duration)
+        if direction in ('down', 'symmetric'):
+            capacity = min(capacity, self.max_charging,
+                           max(self.max_soc - soc, 0) * self.battery_energy_capacity / duration)
+
+        return capacity
+
+    def _hourly_limits(self, product: Optional[str], reserve_mw: float) -> tuple:
+        """
+        Compute the arbitrage limits left after committing a reserve.
+
+        Parameters:
+        - product: Reserve product for the block (None for no reserve)
+        - reserve_mw: Reserved power in MW
+
+        Returns:
+        - Tuple of (max_charging, max_discharging, min_soc, max_soc) for arbitrage
+        """
+        if product is None:
+            return self.max_charging, self.max_discharging, self.min_soc, self.max_soc
+
+        direction = RESERVE_PRODUCTS[product]['direction']
+        buffer = reserve_mw * RESERVE_DURATIONS[RESERVE_PRODUCTS[product]['market']] / self.battery_energy_capacity
+
+        max_charging, max_discharging = self.max_charging, self.max_discharging
+        min_soc, max_soc = self.min_soc, self.max_soc
+
+        if direction in ('up', 'symmetric'):
+            max_discharging = max(max_discharging - reserve_mw, 0)
+            min_soc += buffer
+        if direction in ('down', 'symmetric'):
+            max_charging = max(max_charging - reserve_mw, 0)
+            max_soc -= buffer
+
+        return max_charging, max_discharging, min_soc, max_soc
+
+    def to_json(self) -> str:
+        """
+        Convert the optimizer configuration to a JSON string.
+
+        Returns:
+        - JSON string representation of the optimizer configuration
+        """
+        config = json.loads(super().to_json())
+        config['reserve_products'] = self.reserve_products
+        config['reserve_share'] = self.reserve_share
+        return json.dumps(config)
@@ -0,0 +1,233 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Any, Optional
+
+from app.logic.market_data import DEFAULT_ZONE, available_price_years, load_day_ahead_prices
+from app.logic.stochastic_optimization import StochasticOptimizer
+
+# Forecasting methods
+FORECAST_METHODS = ('seasonal_naive', 'ridge')
+
+# Longest forecast lead supported (one week of hourly prices)
+MAX_FORECAST_HORIZON = 168
+
+# Hours of history needed before the first issue hour for every lag to be available
+WARMUP_HOURS = 2 * MAX_FORECAST_HORIZON
+
+
+class PriceForecaster:
+    """
+    Baseline forecaster of hourly day-ahead prices for leads of 1 to max_horizon hours.
+
+    A forecast issued at the end of hour i only uses prices up to hour i. Two methods:
+    - 'seasonal_naive': the price of the same hour on the most recent day already known.
+    - 'ridge': one ridge regression per lead over the seasonal-naive and weekly lags, the
+      last known price, the mean of the last 24 hours and one-hot hour of day and weekday
+      of the target hour.
+
+    Features are built for all issue hours at once, so fitting and predicting a year is a
+    handful of array operations per lead rather than a refit per hour.
+    """
+
+    def __init__(self, method: str = 'ridge', max_horizon: int = 24, alpha: float = 1.0):
+        """
+        Initialize the forecaster.
+
+        Parameters:
+        - method: One of FORECAST_METHODS
+        - max_horizon: Longest forecast lead in hours (at most MAX_FORECAST_HORIZON)
+        - alpha: Ridge penalty (the intercept is not penalized)
+        """
+        if method not in FORECAST_METHODS:
+            raise ValueError(f"Unknown forecasting method: {method}")
+        if not 1 <= max_horizon <= MAX_FORECAST_HORIZON:
+            raise ValueError(f"max_horizon must be between 1 and {MAX_FORECAST_HORIZON}")
+
+        self.method = method
+        self.max_horizon = max_horizon
+        self.alpha = alpha
+
+        self.coefficients_: Optional[np.ndarray] = None
+        self.residuals_: Optional[np.ndarray] = None
+
+    def fit(self, prices: List[float], datetimes: List[str]) -> 'PriceForecaster':
+        """
+        Fit the forecaster on a historical price series.
+
+        Parameters:
+        - prices: Hourly prices
+        - datetimes: Datetime strings corresponding to the prices
+
+        Returns:
+        - The fitted forecaster
+        """
+        prices = np.asarray(prices, dtype=float)
+        calendar = _calendar(datetimes)
+        n = len(prices)
+
+        # Issue hours with a full week of history
+        issue = np.arange(min(MAX_FORECAST_HORIZON, n), n)
+
+        if self.method == 'ridge':
+            coefficients = []
+            for lead in range(1, self.max_horizon + 1):
+                rows = issue[issue + lead < n]
+                if len(rows) == 0:
+                    raise ValueError("Not enough history to fit the forecaster")
+                features = self._features(prices, calendar, rows, lead)
+                penalty = self.alpha * np.eye(features.shape[1])
+                penalty[-1, -1] = 0.0
+                coefficients.append(np.linalg.solve(features.T @ features + penalty,
+                                                    features.T @ prices[rows + lead]))
+            self.coefficients_ = np.array(coefficients)
+
+        # In-sample forecast errors of the issue hours whose whole horizon is known
+        rows = issue[issue + self.max_horizon < n]
+        forecasts = self._predict_rows(prices, calendar, rows)
+        self.residuals_ = prices[rows[:, None] + np.arange(1, self.max_horizon + 1)[None, :]] - forecasts
+
+        return self
+
+    def predict(self, prices: List[float], datetimes: List[str], horizon: Optional[int] = None) -> np.ndarray:
+        """
+        Forecast the next hours from every hour of a price series.
+
+        Parameters:
+        - prices: Hourly prices (the first WARMUP_HOURS are only used as history by later hours)
+        - datetimes: Datetime strings corresponding to the prices
+        - horizon: Number of leads to forecast (defaults to max_horizon)
+
+        Returns:
+        - Array of shape (len(prices), horizon); row i holds the forecasts of hours i+1 to i+horizon
+        """
+        horizon = horizon or self.max_horizon
+        if horizon > self.max_horizon:
+            raise ValueError(f"horizon must be at most {self.max_horizon}")
+        if self.method == 'ridge' and self.coefficients_ is None:
+            raise ValueError("The forecaster must be fitted before predicting")
+
+        prices = np.asarray(prices, dtype=float)
+        return self._predict_rows(prices, _calendar(datetimes), np.arange(len(prices)), horizon)
+
+    def _predict_rows(self, prices: np.ndarray, calendar: Dict[str, np.ndarray], rows: np.ndarray,
+                      horizon: Optional[int] = None) -> np.ndarray:
+        """
+        Forecasts issued at a set of hours.
+
+        Parameters:
+        - prices: Hourly prices
+        - calendar: Hour of day and weekday of every hour (see _calendar)
+        - rows: Issue hours
+        - horizon: Number of leads (defaults to max_horizon)
+
+        Returns:
+        - Array of shape (len(rows), horizon)
+        """
+        horizon = horizon or self.max_horizon
+        forecasts = np.empty((len(rows), horizon))
+        for lead in range(1, horizon + 1):
+            if self.method == 'seasonal_naive':
+                forecasts[:, lead - 1] = prices[_same_hour_lag(rows, lead)]
+            else:
+                forecasts[:, lead - 1] = self._features(prices, calendar, rows, lead) @ self.coefficients_[lead - 1]
+        return forecasts
+
+    def _features(self, prices: np.ndarray, calendar: Dict[str, np.ndarray], rows: np.ndarray,
+                  lead: int) -> np.ndarray:
+        """
+        Regression features of the forecasts issued at a set of hours for one lead.
+
+        Parameters:
+        - prices: Hourly prices
+        - calendar: Hour of day and weekday of every hour (see _calendar)
+        - rows: Issue hours
+        - lead: Forecast lead in hours
+
+        Returns:
+        - Array of shape (len(rows), 36), the last column being the intercept
+        """
+        weekly_lag = np.clip(rows + lead - 168 * ((lead + 167) // 168), 0, None)
+
+        # Mean of the last 24 known prices, from a running sum
+        running_sum = np.concatenate(([0.0], np.cumsum(prices)))
+        window_start = np.clip(rows - 23, 0, None)
+        recent_mean = (running_sum[rows + 1] - running_sum[window_start]) / (rows + 1 - window_start)
+
+        target_hour = calendar['hour'][rows] + lead
+        hour_of_day = np.eye(24)[target_hour % 24]
+        weekday = np.eye(7)[(calendar['weekday'][rows] + target_hour // 24) % 7]
+
+        return np.column_stack([prices[_same_hour_lag(rows, lead)], prices[weekly_lag], prices[rows],
+                                recent_mean, hour_of_day, weekday, np.ones(len(rows))])
+
+
+def _same_hour_lag(rows: np.ndarray, lead: int) -> np.ndarray:
+    """
+    Index of the most recent known price at the same hour of day as the target hour.
+
+    Parameters:
+    - rows: Issue hours
+    - lead: Forecast lead in hours
+
+    Returns:
+    - Array of price indices (clipped to the start of the series)
+    """
+    return np.clip(rows + lead - 24 * ((lead + 23) // 24), 0, None)
+
+
+def _calendar(datetimes: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Hour of day and weekday of every hour of a series.
+
+    Parameters:
+    - datetimes: Datetime strings
+
+    Returns:
+    - Dictionary of integer arrays 'hour' and 'weekday'
+    """
+    index = pd.DatetimeIndex(pd.to_datetime(datetimes))
+    return {'hour': index.hour.values.astype(int), 'weekday': index.weekday.values.astype(int)}
+
+
+def forecast_backtest(year: int,
+                      optimizer_config: Optional[Dict[str, Any]] = None,
+                      method: str = 'ridge',
+                      n_scenarios: int = 1,
+                      risk_measure: str = 'expected',
+                      zone: str = DEFAULT_ZONE) -> Dict[str, Any]:
+    """
+    Dispatch a year on forecast prices and settle it at the realized ones.
+    The forecaster is fitted on all earlier years of the day-ahead price file, and the end of
+    the previous year is used as history for the first forecasts of the year.
+
+    Parameters:
+    - year: Year to backtest
+    - optimizer_config: Keyword arguments for the optimizer (BatteryOptimizer parameters)
+    - method: Forecasting method (see FORECAST_METHODS)
+    - n_scenarios: Number of scenarios per decision; above 1, past forecast errors are
+      added to the point forecast
+    - risk_measure: 'expected' or 'cvar' (see StochasticOptimizer)
+    - zone: Bidding zone of the prices
+
+    Returns:
+    - Dictionary in the format of BatteryOptimizer.optimize()
+    """
+    training_years = [y for y in available_price_years(zone) if y < year]
+    if not training_years:
+        raise ValueError(f"No day-ahead prices before {year} to fit the forecaster on")
+
+    history = [load_day_ahead_prices(y, zone) for y in training_years]
+    train_prices = np.concatenate([prices for prices, _ in history])
+    train_datetimes = [dt for _, datetimes in history for dt in datetimes]
+    prices, datetimes = load_day_ahead_prices(year, zone)
+
+    forecaster = PriceForecaster(method).fit(train_prices, train_datetimes)
+
+    warmup = min(WARMUP_HOURS, len(train_prices))
+    forecasts = forecaster.predict(np.concatenate([train_prices[-warmup:], prices]),
+                                   train_datetimes[-warmup:] + list(datetimes))[warmup:]
+
+    optimizer = StochasticOptimizer(**(optimizer_config or {}), n_scenarios=n_scenarios,
+                                    scenario_method='forecast', risk_measure=risk_measure,
+                                    forecasts=forecasts, forecast_errors=forecaster.residuals_)
+    return optimizer.optimize(prices, datetimes)
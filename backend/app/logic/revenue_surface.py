@@ -0,0 +1,218 @@
+import numpy as np
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from itertools import product
+from typing import Dict, List, Any, Optional
+
+from app.logic.battery_optimization import BatteryOptimizer
+from app.logic.market_data import DATA_DIR
+from app.logic.shared_prices import price_registry, attach_prices, prepare_workers
+
+# Directory where precomputed surfaces are stored, one file per price dataset
+SURFACE_DIR = os.path.join(DATA_DIR, 'surfaces')
+
+# Grid axes of the revenue surface.
+# The dispatch is scale invariant: multiplying max_charging, max_discharging and the energy
+# capacity by k multiplies the revenue by k. The surface is therefore computed for 1 MW of
+# discharging power and scaled at lookup time, which removes power as a grid dimension.
+SURFACE_AXES = {
+    'charge_ratio': [0.5, 0.7, 0.85, 1.0],        # max_charging / max_discharging
+    'duration': [0.5, 1.0, 2.0, 3.0, 4.0, 6.0, 8.0],  # energy capacity / max_discharging (h)
+    'min_soc': [0.0, 0.1, 0.2, 0.3],
+    'max_soc': [0.7, 0.8, 0.9, 1.0]
+}
+
+
+def _run_grid_point(point: tuple, descriptor: Dict[str, Any]) -> float:
+    """
+    Run the optimizer for one grid point with 1 MW of discharging power.
+
+    Parameters:
+    - point: Tuple of (charge_ratio, duration, min_soc, max_soc)
+    - descriptor: Shared memory descriptor of the prices (see shared_prices.py), attached once per worker
+
+    Returns:
+    - Total revenue in EUR per MW of discharging power
+    """
+    charge_ratio, duration, min_soc, max_soc = point
+    optimizer = BatteryOptimizer(
+        initial_soc=min(max(0.4, min_soc), max_soc),
+        battery_power_capacity=1.0,
+        battery_energy_capacity=duration,
+        min_soc=min_soc,
+        max_soc=max_soc,
+        max_charging=charge_ratio,
+        max_discharging=1.0
+    )
+    return optimizer.optimize(attach_prices(descriptor))['summary']['total_revenue']
+
+
+class RevenueSurface:
+    """
+    Lookup table of yearly arbitrage revenue over a grid of battery configurations.
+
+    Built once per price dataset in a background job and then queried with multilinear
+    interpolation, which takes microseconds instead of a full optimize() run.
+    """
+
+    def __init__(self, axes: Dict[str, List[float]], values: np.ndarray, dataset: str):
+        """
+        Initialize the surface from precomputed values.
+
+        Parameters:
+        - axes: Grid axes, in the order of SURFACE_AXES
+        - values: Revenue per MW of discharging power, shaped like the grid
+        - dataset: Name of the price dataset the surface was computed on
+        """
+        self.axes = {name: np.asarray(axis, dtype=float) for name, axis in axes.items()}
+        self.values = np.asarray(values, dtype=float)
+        self.dataset = dataset
+
+        self._axis_list = list(self.axes.values())
+        if any(len(axis) < 2 for axis in self._axis_list):
+            raise ValueError("Every surface axis needs at least two grid points")
+        self._lower = np.array([axis[0] for axis in self.axes.values()])
+        self._upper = np.array([axis[-1] for axis in self.axes.values()])
+
+    @classmethod
+    def build(cls, prices: List[float], dataset: str, axes: Optional[Dict[str, List[float]]] = None,
+              max_workers: Optional[int] = None, executor: Optional[Executor] = None) -> 'RevenueSurface':
+        """
+        Compute the surface by running the optimizer at every grid point.
+        Grid points are distributed in batches over a process pool.
+
+        Parameters:
+        - prices: Hourly prices of the dataset
+        - dataset: Name of the price dataset
+        - axes: Optional grid axes (defaults to SURFACE_AXES)
+        - max_workers: Number of worker processes (defaults to the number of CPUs)
+        - executor: Optional running process pool with max_workers workers, used instead of
+          starting a pool for the build (e.g. the API's optimizer pool)
+
+        Returns:
+        - RevenueSurface instance
+        """
+        axes = axes or SURFACE_AXES
+        points = list(product(*axes.values()))
+
+        # Workers read the prices from shared memory instead of receiving a copy each.
+        # Publishing under the dataset name reuses the block when the series is already shared.
+        descriptor = price_registry.publish(dataset, prices)
+        prepare_workers()
+        try:
+            run = partial(_run_grid_point, descriptor=descriptor)
+            workers = max_workers or os.cpu_count() or 1
+            chunksize = max(1, len(points) // (4 * workers))
+            if executor is not None:
+                revenues = list(executor.map(run, points, chunksize=chunksize))
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    revenues = list(pool.map(run, points, chunksize=chunksize))
+        finally:
+            price_registry.release(dataset)
+
+        shape = tuple(len(axis) for axis in axes.values())
+        return cls(axes, np.array(revenues).reshape(shape), dataset)
+
+    def estimate(self, max_charging: float, max_discharging: float, battery_energy_capacity: float,
+                 min_soc: float, max_soc: float) -> Dict[str, Any]:
+        """
+        Estimate the yearly revenue of a battery configuration.
+        Configurations outside the grid are clamped to its boundary.
+
+        Parameters:
+        - max_charging: Maximum charging power in MW
+        - max_discharging: Maximum discharging power in MW
+        - battery_energy_capacity: Energy capacity in MWh
+        - min_soc: Minimum state of charge (0-1)
+        - max_soc: Maximum state of charge (0-1)
+
+        Returns:
+        - Dictionary with the estimated revenue and whether the point was clamped
+        """
+        point = np.array([max_charging / max_discharging,
+                          battery_energy_capacity / max_discharging,
+                          min_soc,
+                          max_soc])
+        clamped_point = np.clip(point, self._lower, self._upper)
+
+        revenue_per_mw = self._interpolate(clamped_point)
+
+        return {
+            'total_revenue': revenue_per_mw * max_discharging,
+            'extrapolated': bool(np.any(clamped_point != point)),
+            'dataset': self.dataset
+        }
+
+    def _interpolate(self, point: np.ndarray) -> float:
+        """
+        Multilinear interpolation of the surface at a point inside the grid.
+        Only the 2^d corners of the enclosing cell are touched, which keeps a lookup
+        in the tens of microseconds.
+
+        Parameters:
+        - point: Coordinates along each axis, within the grid bounds
+
+        Returns:
+        - Interpolated revenue per MW of discharging power
+        """
+        cell = []
+        weights = []
+        for axis, x in zip(self._axis_list, point):
+            i = min(max(int(np.searchsorted(axis, x)) - 1, 0), len(axis) - 2)
+            cell.append(slice(i, i + 2))
+            weights.append((x - axis[i]) / (axis[i + 1] - axis[i]))
+
+        # Collapse the cell one axis at a time
+        corners = self.values[tuple(cell)]
+        for t in weights:
+            corners = corners[0] * (1 - t) + corners[1] * t
+
+        return float(corners)
+
+    def save(self, path: Optional[str] = None) -> str:
+        """
+        Save the surface to a .npz file.
+
+        Parameters:
+        - path: Optional file path (defaults to SURFACE_DIR/<dataset>.npz)
+
+        Returns:
+        - Path of the written file
+        """
+        path = path or surface_path(self.dataset)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez(path, values=self.values, axis_names=np.array(list(self.axes)),
+                 **{f'axis_{name}': axis for name, axis in self.axes.items()})
+        return path
+
+    @classmethod
+    def load(cls, dataset: str, path: Optional[str] = None) -> 'RevenueSurface':
+        """
+        Load a surface saved with save().
+
+        Parameters:
+        - dataset: Name of the price dataset
+        - path: Optional file path (defaults to SURFACE_DIR/<dataset>.npz)
+
+        Returns:
+        - RevenueSurface instance
+        """
+        with np.load(path or surface_path(dataset)) as data:
+            axes = {str(name): data[f'axis_{name}'] for name in data['axis_names']}
+            values = data['values']
+        return cls(axes, values, dataset)
+
+
+def surface_path(dataset: str) -> str:
+    """
+    Path of the stored surface of a price dataset.
+
+    Parameters:
+    - dataset: Name of the price dataset
+
+    Returns:
+    - File path
+    """
+    return os.path.join(SURFACE_DIR, f'{dataset}.npz')
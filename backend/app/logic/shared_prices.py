@@ -0,0 +1,146 @@
+import numpy as np
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Any, Optional
+
+
+class SharedPriceRegistry:
+    """
+    Publishes price series into shared memory blocks so worker processes can read them
+    without re-reading the CSV files or receiving a pickled copy.
+
+    The publishing process owns the blocks. Each publish() of a key takes a reference and
+    each release() drops one; the block is unlinked when the last reference is released.
+    Workers attach to a block by name with attach_prices(), passing only the small
+    descriptor returned by publish(). Call prepare_workers() before starting the workers.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty registry.
+        """
+        self._blocks: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, key: str, prices: np.ndarray) -> Dict[str, Any]:
+        """
+        Copy a price series into shared memory, or take another reference if it is already published.
+
+        Parameters:
+        - key: Name of the price series (e.g. 'DE-LU_2024')
+        - prices: Array of prices
+
+        Returns:
+        - Descriptor with the block name, shape and dtype, to be passed to attach_prices()
+        """
+        with self._lock:
+            if key in self._blocks:
+                self._blocks[key]['refcount'] += 1
+                return self._blocks[key]['descriptor']
+
+            prices = np.ascontiguousarray(prices, dtype=float)
+            block = shared_memory.SharedMemory(create=True, size=max(prices.nbytes, 1))
+            np.ndarray(prices.shape, dtype=prices.dtype, buffer=block.buf)[:] = prices
+
+            descriptor = {'name': block.name, 'shape': prices.shape, 'dtype': prices.dtype.str}
+            self._blocks[key] = {'block': block, 'refcount': 1, 'descriptor': descriptor}
+
+            return descriptor
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the descriptor of a published series without taking a reference.
+
+        Parameters:
+        - key: Name of the price series
+
+        Returns:
+        - Descriptor, or None if the series is not published
+        """
+        with self._lock:
+            entry = self._blocks.get(key)
+            return entry['descriptor'] if entry else None
+
+    def release(self, key: str) -> None:
+        """
+        Drop one reference to a published series and free its block when none are left.
+
+        Parameters:
+        - key: Name of the price series
+        """
+        with self._lock:
+            entry = self._blocks.get(key)
+            if entry is None:
+                return
+            entry['refcount'] -= 1
+            if entry['refcount'] <= 0:
+                del self._blocks[key]
+                entry['block'].close()
+                entry['block'].unlink()
+
+    def release_all(self) -> None:
+        """
+        Free every block owned by this registry, regardless of outstanding references.
+        """
+        with self._lock:
+            for entry in self._blocks.values():
+                entry['block'].close()
+                try:
+                    entry['block'].unlink()
+                except FileNotFoundError:
+                    pass
+            self._blocks.clear()
+
+
+def prepare_workers() -> None:
+    """
+    Start the resource tracker of the publishing process before worker processes are created.
+    Workers then share it, so a worker exiting does not unlink blocks it attached to.
+    """
+    resource_tracker.ensure_running()
+
+
+# Blocks attached in the current process, kept open for as long as the arrays are in use
+_attached: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def attach_prices(descriptor: Dict[str, Any]) -> np.ndarray:
+    """
+    Map a published price series into the current process without copying it.
+    Repeated calls with the same descriptor reuse the existing mapping.
+
+    Parameters:
+    - descriptor: Descriptor returned by SharedPriceRegistry.publish()
+
+    Returns:
+    - Read-only array backed by the shared memory block
+    """
+    name = descriptor['name']
+    if name not in _attached:
+        try:
+            # Python 3.13+: readers must not register the block with the resource tracker
+            _attached[name] = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            _attached[name] = shared_memory.SharedMemory(name=name)
+
+    prices = np.ndarray(descriptor['shape'], dtype=np.dtype(descriptor['dtype']), buffer=_attached[name].buf)
+    prices.flags.writeable = False
+
+    return prices
+
+
+def detach_prices(descriptor: Dict[str, Any]) -> None:
+    """
+    Close the mapping of a price series in the current process.
+    Arrays returned by attach_prices() for it must no longer be used.
+
+    Parameters:
+    - descriptor: Descriptor returned by SharedPriceRegistry.publish()
+    """
+    block = _attached.pop(descriptor['name'], None)
+    if block is not None:
+        block.close()
+
+
+# Registry of the price series published by this process
+price_registry = SharedPriceRegistry()
@@ -0,0 +1,176 @@
+import numpy as np
+import math
+from typing import Dict, List, Any, Optional
+
+from app.logic.battery_optimization import BatteryOptimizer
+from app.logic.dispatch_kernels import NUMBA_AVAILABLE, build_scenarios, dispatch_scenarios, dispatch_scenarios_batched
+
+# Ways of generating the price scenarios seen at each decision
+SCENARIO_METHODS = ('analog', 'noise', 'forecast')
+
+# Ways of scoring an action over its scenarios
+RISK_MEASURES = ('expected', 'cvar')
+
+
+class StochasticOptimizer(BatteryOptimizer):
+    """
+    Battery optimizer with imperfect foresight.
+
+    BatteryOptimizer scores each action on the realized prices of the next hours, i.e. with
+    perfect short-term foresight. Here every action is scored over K price scenarios per hour
+    instead, either by its expected revenue or by its CVaR (the mean of the worst outcomes),
+    and the chosen action is settled at the realized price of the hour. The K rollouts of a
+    decision run over one (K, horizon) array in the compiled dispatch kernel.
+
+    Scenario methods:
+    - 'analog': forecasts built from the same hours of the K previous days, shifted to the
+      current price level. Only past prices are used.
+    - 'noise': the realized prices plus Gaussian errors whose spread grows with the square
+      root of the lead time, scaled by the volatility of hourly price changes.
+    - 'forecast': precomputed price forecasts (see price_forecasting.py), plus K sampled
+      past forecast errors when forecast_errors is given.
+    """
+
+    def __init__(self,
+                 initial_soc: float = 0.4,
+                 battery_power_capacity: float = 10,
+                 battery_energy_capacity: float = 40,
+                 min_soc: float = 0.2,
+                 max_soc: float = 0.8,
+                 max_charging: float = 7,
+                 max_discharging: float = 10,
+                 n_scenarios: int = 10,
+                 scenario_method: str = 'analog',
+                 risk_measure: str = 'expected',
+                 cvar_alpha: float = 0.2,
+                 noise_scale: float = 1.0,
+                 seed: Optional[int] = 0,
+                 forecasts: Optional[np.ndarray] = None,
+                 forecast_errors: Optional[np.ndarray] = None):
+        """
+        Initialize the stochastic optimizer.
+
+        Parameters:
+        - initial_soc, battery_power_capacity, battery_energy_capacity, min_soc, max_soc,
+          max_charging, max_discharging: See BatteryOptimizer
+        - n_scenarios: Number of price scenarios (K) evaluated per decision
+        - scenario_method: One of SCENARIO_METHODS
+        - risk_measure: 'expected' for the mean revenue, 'cvar' for the mean of the worst outcomes
+        - cvar_alpha: Share of the scenarios averaged by the CVaR (0-1)
+        - noise_scale: Size of the forecast errors of the 'noise' method, relative to the
+          volatility of hourly price changes
+        - seed: Seed of the random forecast errors (None for a different draw on every run)
+        - forecasts: Array of shape (hours, >= action_horizon) for the 'forecast' method;
+          row i holds the forecasts of hours i+1, i+2, ... issued at hour i
+        - forecast_errors: Optional array of past forecast errors, shaped (samples, >= action_horizon)
+        """
+        super().__init__(initial_soc, battery_power_capacity, battery_energy_capacity,
+                         min_soc, max_soc, max_charging, max_discharging)
+
+        if n_scenarios < 1:
+            raise ValueError("n_scenarios must be at least 1")
+        if scenario_method not in SCENARIO_METHODS:
+            raise ValueError(f"Unknown scenario method: {scenario_method}")
+        if risk_measure not in RISK_MEASURES:
+            raise ValueError(f"Unknown risk measure: {risk_measure}")
+        if not 0 < cvar_alpha <= 1:
+            raise ValueError("cvar_alpha must be in (0, 1]")
+        if scenario_method == 'forecast' and forecasts is None:
+            raise ValueError("The 'forecast' scenario method needs forecasts")
+
+        self.n_scenarios = n_scenarios
+        self.scenario_method = scenario_method
+        self.risk_measure = risk_measure
+        self.cvar_alpha = cvar_alpha
+        self.noise_scale = noise_scale
+        self.seed = seed
+        self.forecasts = forecasts
+        self.forecast_errors = forecast_errors
+
+    def optimize(self, prices: Optional[List[float]] = None, datetimes: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Run the optimization with imperfect foresight.
+
+        Parameters:
+        - prices: Optional list of hourly electricity prices (fetched from the default CSV if omitted)
+        - datetimes: Optional list of datetime strings corresponding to the prices
+
+        Returns:
+        - Dictionary in the format of BatteryOptimizer.optimize(). The charge/discharge/hold
+          revenues of each hour are the scores of the actions over the scenarios, and the
+          summary describes the scenario settings.
+        """
+        response = super().optimize(prices, datetimes)
+        response['summary']['scenarios'] = {
+            'n_scenarios': self.n_scenarios,
+            'scenario_method': self.scenario_method,
+            'risk_measure': self.risk_measure,
+            'cvar_alpha': self.cvar_alpha if self.risk_measure == 'cvar' else None
+        }
+        return response
+
+    def _run_dispatch(self, prices_array: np.ndarray) -> tuple:
+        """
+        Run the hour-by-hour dispatch with each action scored over the scenario set.
+
+        Parameters:
+        - prices_array: Array of hourly electricity prices (float)
+
+        Returns:
+        - Tuple of arrays in the format of BatteryOptimizer._run_dispatch()
+        """
+        scenarios = self._build_scenario_set(prices_array)
+        # Without Numba, the scenarios of each hour are rolled out as arrays instead of one by one
+        run = dispatch_scenarios if NUMBA_AVAILABLE else dispatch_scenarios_batched
+        return run(prices_array, scenarios, float(self.battery_energy_capacity), float(self.max_charging),
+                   float(self.max_discharging), float(self.min_soc), float(self.max_soc), float(self.initial_soc),
+                   self._tail_count())
+
+    def _tail_count(self) -> int:
+        """
+        Number of worst scenarios averaged in the score of an action (all of them for the expected value).
+
+        Returns:
+        - Number of scenarios
+        """
+        if self.risk_measure == 'expected':
+            return self.n_scenarios
+        return max(1, math.ceil(self.cvar_alpha * self.n_scenarios))
+
+    def _build_scenario_set(self, prices_array: np.ndarray) -> np.ndarray:
+        """
+        Build the price scenarios of every hour in one vectorized pass.
+        Like BatteryOptimizer._get_price_scenario, entry h of a scenario is the price of hour i + 1 + h.
+
+        Parameters:
+        - prices_array: Array of hourly electricity prices (float)
+
+        Returns:
+        - Array of shape (hours, n_scenarios, action_horizon)
+        """
+        n = len(prices_array)
+        hours = np.arange(n)[:, None, None]
+        leads = np.arange(1, self.action_horizon + 1)[None, None, :]
+
+        if self.scenario_method == 'analog':
+            # The path that followed the same hour k days ago, anchored on the current price
+            lags = 24 * np.arange(1, self.n_scenarios + 1)[None, :, None]
+            anchor = np.clip(hours - lags, 0, None)
+            analog = np.clip(hours + leads - lags, 0, hours)
+            return prices_array[hours] + prices_array[analog] - prices_array[anchor]
+
+        if self.scenario_method == 'forecast':
+            forecasts = np.asarray(self.forecasts, dtype=float)[:, :self.action_horizon]
+            if len(forecasts) != n:
+                raise ValueError("Forecasts must have one row per hour of prices")
+            if self.forecast_errors is None or self.n_scenarios == 1:
+                return np.repeat(forecasts[:, None, :], self.n_scenarios, axis=1)
+            # Whole error paths are sampled to keep their correlation across leads
+            errors = np.asarray(self.forecast_errors, dtype=float)[:, :self.action_horizon]
+            samples = np.random.default_rng(self.seed).integers(0, len(errors), (n, self.n_scenarios))
+            return forecasts[:, None, :] + errors[samples]
+
+        realized = build_scenarios(prices_array, self.look_ahead, self.action_horizon)
+        volatility = np.std(np.diff(prices_array)) if n > 1 else 0.0
+        errors = np.random.default_rng(self.seed).standard_normal((n, self.n_scenarios, self.action_horizon))
+        return realized[:, None, :] + errors * (self.noise_scale * volatility * np.sqrt(leads))
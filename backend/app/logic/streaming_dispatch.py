@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+import csv
+import json
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from app.logic.battery_optimization import BatteryOptimizer
+from app.logic.dispatch_kernels import ACTIONS, build_scenarios, dispatch
+from app.logic.market_data import DEFAULT_ZONE, day_ahead_price_file
+
+# Price rows read and dispatched at a time
+DEFAULT_CHUNK_SIZE = 24 * 30
+
+# Columns of the streamed results file (the per-hour fields of BatteryOptimizer.optimize())
+RESULT_COLUMNS = ['hour', 'datetime', 'price', 'action', 'quantity', 'revenue', 'expected_revenue', 'soc',
+                  'charge_revenue', 'discharge_revenue', 'hold_revenue', 'cumulative_revenue']
+
+
+def iter_price_chunks(path: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      price_column: str = 'price_eur_mwh') -> Iterable[Tuple[np.ndarray, List[str]]]:
+    """
+    Read a price file in fixed-size chunks without loading it whole.
+
+    Parameters:
+    - path: CSV file with a datetime column and a price column (defaults to the DE-LU day-ahead file)
+    - chunk_size: Number of rows per chunk
+    - price_column: Name of the price column
+
+    Returns:
+    - Iterator of (prices, datetimes) tuples, one per chunk
+    """
+    for chunk in pd.read_csv(path or day_ahead_price_file(DEFAULT_ZONE), chunksize=chunk_size):
+        yield chunk[price_column].to_numpy(dtype=float), chunk['datetime'].astype(str).tolist()
+
+
+class StreamingDispatch:
+    """
+    Runs the BatteryOptimizer dispatch over a price series delivered in chunks and writes the
+    per-hour results to a CSV file as they are produced.
+
+    The decision of an hour needs the prices of the next action_horizon hours, so the last
+    action_horizon prices of each chunk are held back and dispatched together with the next
+    chunk. Only those overlap prices, the SOC and the running totals are carried across
+    chunks, so memory use is bounded by the chunk size rather than the length of the history.
+    The results and summary are identical to a single BatteryOptimizer.optimize() run.
+    """
+
+    def __init__(self, optimizer: Optional[BatteryOptimizer] = None):
+        """
+        Initialize the streaming dispatch.
+
+        Parameters:
+        - optimizer: Battery configuration to dispatch (defaults to BatteryOptimizer()).
+          Only the base heuristic is streamed; subclasses that override the dispatch are not supported.
+        """
+        if optimizer is not None and type(optimizer) is not BatteryOptimizer:
+            raise TypeError(f"StreamingDispatch only supports BatteryOptimizer, not {type(optimizer).__name__}")
+        self.optimizer = optimizer or BatteryOptimizer()
+
+    def run(self, chunks: Iterable[Tuple[Any, Optional[List[str]]]], output_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Dispatch a chunked price series.
+
+        Parameters:
+        - chunks: Iterable of (prices, datetimes) tuples in chronological order (see iter_price_chunks);
+          datetimes may be None
+        - output_path: Optional CSV file receiving one row per hour (see RESULT_COLUMNS)
+
+        Returns:
+        - Summary in the format of BatteryOptimizer.optimize()
+        """
+        optimizer = self.optimizer
+        horizon = optimizer.action_horizon
+
+        # State carried across chunks
+        pending_prices = np.empty(0)
+        pending_datetimes: List[Optional[str]] = []
+        hour = 0
+        soc = float(optimizer.initial_soc)
+        total_revenue = 0.0
+        action_counts = np.zeros(len(ACTIONS), dtype=np.int64)
+
+        output = open(output_path, 'w', newline='') if output_path else None
+        try:
+            writer = csv.writer(output) if output else None
+            if writer:
+                writer.writerow(RESULT_COLUMNS)
+
+            for prices, datetimes, final in _with_last_flag(chunks):
+                prices = np.asarray(prices, dtype=float)
+                pending_prices = np.concatenate((pending_prices, prices))
+                pending_datetimes += list(datetimes) if datetimes is not None else [None] * len(prices)
+
+                # Hours whose whole look-ahead window is known (all of them at the end of the series)
+                ready = len(pending_prices) if final else max(len(pending_prices) - horizon, 0)
+                if ready == 0:
+                    continue
+
+                scenarios = build_scenarios(pending_prices, optimizer.look_ahead, horizon)[:ready]
+                arrays = dispatch(pending_prices[:ready], scenarios, float(optimizer.battery_energy_capacity),
+                                  float(optimizer.max_charging), float(optimizer.max_discharging),
+                                  float(optimizer.min_soc), float(optimizer.max_soc), soc)
+                actions, revenues, socs = arrays[0], arrays[2], arrays[3]
+
+                # Running totals continue hour by hour, like BatteryOptimizer.optimize()
+                cumulative_revenue = np.cumsum(np.concatenate(([total_revenue], revenues)))[1:]
+                if writer:
+                    _write_rows(writer, hour, pending_prices[:ready], pending_datetimes[:ready],
+                                arrays, cumulative_revenue)
+
+                hour += ready
+                soc = float(socs[-1])
+                total_revenue = float(cumulative_revenue[-1])
+                action_counts += np.bincount(actions, minlength=len(ACTIONS))
+
+                pending_prices = pending_prices[ready:]
+                pending_datetimes = pending_datetimes[ready:]
+        finally:
+            if output:
+                output.close()
+
+        return {
+            'total_revenue': total_revenue,
+            'action_counts': {action: int(count) for action, count in zip(ACTIONS, action_counts) if count},
+            'final_soc': soc,
+            'hours': hour,
+            'parameters': json.loads(optimizer.to_json())
+        }
+
+
+def _with_last_flag(chunks: Iterable[Tuple[Any, Optional[List[str]]]]) -> Iterable[Tuple[Any, Any, bool]]:
+    """
+    Yield (prices, datetimes, is_last_chunk) while reading only one chunk ahead.
+
+    Parameters:
+    - chunks: Iterable of (prices, datetimes) tuples
+
+    Returns:
+    - Iterator of (prices, datetimes, final) tuples; an empty final chunk is added for an empty series
+    """
+    iterator = iter(chunks)
+    current = next(iterator, None)
+    if current is None:
+        yield np.empty(0), [], True
+        return
+    for following in iterator:
+        yield current[0], current[1], False
+        current = following
+    yield current[0], current[1], True
+
+
+def _write_rows(writer, first_hour: int, prices: np.ndarray, datetimes: List[Optional[str]],
+                arrays: tuple, cumulative_revenue: np.ndarray) -> None:
+    """
+    Append the per-hour results of a dispatched chunk to the results file.
+
+    Parameters:
+    - writer: csv.writer of the results file
+    - first_hour: Index of the first hour of the chunk in the whole series
+    - prices: Prices of the chunk
+    - datetimes: Datetime strings of the chunk (entries may be None)
+    - arrays: Output of dispatch_kernels.dispatch for the chunk
+    - cumulative_revenue: Cumulative revenue at the end of each hour of the chunk
+    """
+    actions, quantities, revenues, socs, charge_revenues, discharge_revenues, hold_revenues = arrays
+    expected_revenues = np.choose(actions, [charge_revenues, discharge_revenues, hold_revenues])
+    writer.writerows(zip(range(first_hour, first_hour + len(prices)), datetimes, prices.tolist(),
+                         [ACTIONS[action] for action in actions.tolist()], quantities.tolist(), revenues.tolist(),
+                         expected_revenues.tolist(), socs.tolist(), charge_revenues.tolist(),
+                         discharge_revenues.tolist(), hold_revenues.tolist(), cumulative_revenue.tolist()))
@@ -0,0 +1,49 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+# Battery configuration accepted by the optimization endpoints (mirrors BatteryOptimizer)
+class BatteryConfig(BaseModel):
+    initial_soc: float = Field(0.4, ge=0, le=1, description="Initial state of charge (0-1)")
+    battery_power_capacity: float = Field(10, gt=0, description="Maximum power capacity in MW")
+    battery_energy_capacity: float = Field(40, gt=0, description="Maximum energy capacity in MWh")
+    min_soc: float = Field(0.2, ge=0, le=1, description="Minimum state of charge (0-1)")
+    max_soc: float = Field(0.8, ge=0, le=1, description="Maximum state of charge (0-1)")
+    max_charging: float = Field(7, gt=0, description="Maximum charging power in MW")
+    max_discharging: float = Field(10, gt=0, description="Maximum discharging power in MW")
+
+# Interpolated revenue from a precomputed surface
+class RevenueEstimateResponse(BaseModel):
+    total_revenue: float
+    extrapolated: bool = Field(..., description="True if the configuration lies outside the precomputed grid")
+    dataset: str
+
+# Build state of a revenue surface
+class SurfaceStatusResponse(BaseModel):
+    dataset: str
+    status: str = Field(..., description="One of 'missing', 'building', 'ready' or 'failed'")
+
+# Summary of an exact optimization run
+class OptimizationSummaryResponse(BaseModel):
+    total_revenue: float
+    action_counts: Dict[str, int]
+    final_soc: float
+    parameters: Dict[str, Optional[float]]
+
+# Result of one project of a portfolio run
+class ProjectSimulationResponse(BaseModel):
+    project_id: Optional[str] = None
+    name: Optional[str] = None
+    zone: Optional[str] = Field(None, description="Bidding zone of the project's country")
+    summary: Optional[OptimizationSummaryResponse] = None
+    error: Optional[str] = Field(None, description="Why the project could not be simulated")
+
+# Totals of the projects of one bidding zone
+class ZoneSummaryResponse(BaseModel):
+    projects: int
+    total_revenue: float
+
+# Portfolio run over the projects of a pipeline, grouped by bidding zone
+class PortfolioSimulationResponse(BaseModel):
+    year: int
+    zones: Dict[str, ZoneSummaryResponse]
+    projects: List[ProjectSimulationResponse]
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from typing import List, Optional
 from datetime import datetime # Import datetime for created_at typing
 
@@ -17,3 +17,6 @@ class PipelineResponse(PipelineBase):
 
     class Config:
         from_attributes = True # Replaces orm_mode in Pydantic v2
+
+# Prebuilt validator and serializer for list endpoints (see app/api/v1/responses.py)
+pipeline_list_adapter = TypeAdapter(List[PipelineResponse])
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from typing import List, Optional
 from datetime import datetime
 
@@ -45,3 +45,6 @@ class ProjectResponse(ProjectBase):
 
     class Config:
         from_attributes = True # For Pydantic v2
+
+# Prebuilt validator and serializer for list endpoints (see app/api/v1/responses.py)
+project_list_adapter = TypeAdapter(List[ProjectResponse])
@@ -0,0 +1,326 @@
+import asyncio
+import hashlib
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Tuple
+
+# The logic layer (pandas, numpy, scipy) is imported on first use rather than at startup
+if TYPE_CHECKING:
+    from app.logic.revenue_surface import RevenueSurface
+
+logger = logging.getLogger(__name__)
+
+# Bidding zone used when none is given (same as market_data.DEFAULT_ZONE, which is not imported at startup)
+DEFAULT_ZONE = "DE-LU"
+
+# Price year used when none is given, published to shared memory when the optimizer pool starts
+DEFAULT_YEAR = 2024
+
+# Upper bound of the default optimizer pool size (see default_optimizer_workers)
+DEFAULT_OPTIMIZER_WORKERS = 2
+
+# Surfaces loaded in this process and the build state of each dataset
+_surfaces: Dict[str, "RevenueSurface"] = {}
+_build_status: Dict[str, str] = {}
+
+# Process pool running exact optimizations and surface builds, started by the application lifespan (see main.py)
+_optimizer_pool: Optional[ProcessPoolExecutor] = None
+_optimizer_workers = 0
+
+# Optimizations currently running, keyed by configuration and price fingerprint (see run_optimization)
+_in_flight: Dict[Tuple, "asyncio.Task"] = {}
+
+
+def dataset_name(year: int, zone: str = DEFAULT_ZONE) -> str:
+    """Name of the price dataset of a bidding zone and year."""
+    return f"{zone}_{year}"
+
+
+def _init_optimizer_worker() -> None:
+    """Imports the optimizer engine once when a pool worker starts."""
+    from app.logic import battery_optimization  # noqa: F401 (imported for its startup cost)
+
+
+def _worker_ready() -> int:
+    """No-op task used to make the pool fork and initialize its workers ahead of the first request."""
+    return os.getpid()
+
+
+def _optimize_summary(config: Dict[str, Any], prices: Any) -> Dict[str, Any]:
+    """
+    Runs an optimization and returns its summary (executed in a pool worker or a thread).
+    Prices are either an array or a shared memory descriptor published by this service.
+    """
+    from app.logic.battery_optimization import BatteryOptimizer
+    from app.logic.shared_prices import attach_prices
+
+    if isinstance(prices, dict):
+        prices = attach_prices(prices)
+    return BatteryOptimizer(**config).optimize(prices)['summary']
+
+
+def _optimize_batch(configs: List[Dict[str, Any]], prices: Any) -> List[Dict[str, Any]]:
+    """
+    Runs the optimizations of several battery configurations on the same prices (one zone of a
+    portfolio). Returns one entry per configuration with either its summary or its error.
+    """
+    from app.logic.shared_prices import attach_prices
+
+    if isinstance(prices, dict):
+        prices = attach_prices(prices)
+
+    outcomes = []
+    for config in configs:
+        try:
+            outcomes.append({'summary': _optimize_summary(config, prices), 'error': None})
+        except Exception as e:
+            outcomes.append({'summary': None, 'error': str(e)})
+    return outcomes
+
+
+def _shared_prices(year: int, zone: str = DEFAULT_ZONE) -> Dict[str, Any]:
+    """
+    Returns the shared memory descriptor of a price year, publishing it on first use.
+    The CSV is read once in this process; pool workers attach to the block by name.
+    """
+    from app.logic.market_data import load_day_ahead_prices
+    from app.logic.shared_prices import price_registry
+
+    dataset = dataset_name(year, zone)
+    descriptor = price_registry.get(dataset)
+    if descriptor is None:
+        prices, _ = load_day_ahead_prices(year, zone)
+        descriptor = price_registry.publish(dataset, prices)
+    return descriptor
+
+
+def default_optimizer_workers() -> int:
+    """
+    Returns the default optimizer pool size: at most DEFAULT_OPTIMIZER_WORKERS, and no more than
+    the CPUs left to each API worker (WEB_CONCURRENCY), since every API worker starts its own pool.
+    """
+    web_workers = int(os.environ.get("WEB_CONCURRENCY", "1")) or 1
+    return max(1, min(DEFAULT_OPTIMIZER_WORKERS, (os.cpu_count() or 1) // web_workers))
+
+
+def start_optimizer_pool(workers: Optional[int] = None) -> None:
+    """
+    Starts the optimizer process pool, pre-forks its workers and publishes the prices of the
+    default year to shared memory. Workers import the engine in the background and attach to
+    the published prices without copying, so the first request does not read the CSV.
+    """
+    from app.logic.shared_prices import prepare_workers
+
+    global _optimizer_pool, _optimizer_workers
+    workers = workers or default_optimizer_workers()
+    prepare_workers()
+    _optimizer_pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_optimizer_worker)
+    _optimizer_workers = workers
+    for _ in range(workers):
+        _optimizer_pool.submit(_worker_ready)
+    logger.info(f"Started optimizer pool with {workers} workers")
+
+    try:
+        _shared_prices(DEFAULT_YEAR, DEFAULT_ZONE)
+    except ValueError as e:
+        logger.warning(f"Prices of the default year not preloaded: {e}")
+
+
+def shutdown_optimizer_pool() -> None:
+    """Stops the optimizer process pool and frees the shared price data."""
+    global _optimizer_pool
+    if _optimizer_pool is not None:
+        _optimizer_pool.shutdown(wait=True, cancel_futures=True)
+        _optimizer_pool = None
+
+        from app.logic.shared_prices import price_registry
+        price_registry.release_all()
+
+
+def get_surface_status(year: int, zone: str = DEFAULT_ZONE) -> str:
+    """Returns the build state of the revenue surface of a year."""
+    from app.logic.revenue_surface import surface_path
+
+    dataset = dataset_name(year, zone)
+    if dataset in _build_status:
+        return _build_status[dataset]
+    if dataset in _surfaces or os.path.exists(surface_path(dataset)):
+        return "ready"
+    return "missing"
+
+
+def zone_available(zone: str) -> bool:
+    """Returns whether day-ahead prices are available for a bidding zone."""
+    from app.logic.market_data import available_zones
+
+    return zone in available_zones()
+
+
+def price_years(zone: str = DEFAULT_ZONE) -> List[int]:
+    """Returns the years with day-ahead prices in a bidding zone (none if the zone has no price file)."""
+    from app.logic.market_data import available_price_years
+
+    try:
+        return available_price_years(zone)
+    except ValueError:
+        return []
+
+
+def claim_surface_build(year: int, zone: str = DEFAULT_ZONE) -> bool:
+    """
+    Marks the revenue surface of a year as building, unless a build is already running.
+    Called before the build task is scheduled, so concurrent requests start a single build.
+    Returns whether the caller should schedule the build.
+    """
+    dataset = dataset_name(year, zone)
+    if _build_status.get(dataset) == "building":
+        return False
+    _build_status[dataset] = "building"
+    return True
+
+
+def build_revenue_surface(year: int, zone: str = DEFAULT_ZONE) -> None:
+    """
+    Precomputes and stores the revenue surface of a year.
+    Meant to run as a background task; failures are logged and reflected in the status.
+    """
+    from app.logic.market_data import load_day_ahead_prices
+    from app.logic.revenue_surface import RevenueSurface
+
+    dataset = dataset_name(year, zone)
+    _build_status[dataset] = "building"
+    try:
+        prices, _ = load_day_ahead_prices(year, zone)
+        logger.info(f"Building revenue surface for {dataset}")
+        # The build runs on the optimizer pool when one is running, rather than starting its own processes
+        surface = RevenueSurface.build(prices, dataset, max_workers=_optimizer_workers or None, executor=_optimizer_pool)
+        surface.save()
+        _surfaces[dataset] = surface
+        _build_status[dataset] = "ready"
+        logger.info(f"Revenue surface for {dataset} is ready")
+    except Exception as e:
+        _build_status[dataset] = "failed"
+        logger.error(f"Error building revenue surface for {dataset}: {e}", exc_info=True)
+
+
+def get_revenue_surface(year: int, zone: str = DEFAULT_ZONE) -> Optional["RevenueSurface"]:
+    """Returns the revenue surface of a year, loading it from disk on first use."""
+    from app.logic.revenue_surface import RevenueSurface, surface_path
+
+    dataset = dataset_name(year, zone)
+    if dataset not in _surfaces:
+        if not os.path.exists(surface_path(dataset)):
+            return None
+        _surfaces[dataset] = RevenueSurface.load(dataset)
+    return _surfaces[dataset]
+
+
+def price_fingerprint(prices: Any) -> str:
+    """Returns a short content hash of a price series, identifying it independently of its source."""
+    import numpy as np
+
+    data = np.ascontiguousarray(prices, dtype=float)
+    return hashlib.blake2b(data.tobytes(), digest_size=16).hexdigest()
+
+
+def _optimization_key(config: Dict[str, Any], fingerprint: str) -> Tuple:
+    """Returns the key under which identical optimization requests are coalesced."""
+    return tuple(sorted(config.items())), fingerprint
+
+
+async def _execute_optimization(config: Dict[str, Any], year: int, zone: str, prices: Any) -> Dict[str, Any]:
+    """
+    Runs an exact optimization for a battery configuration and returns its summary.
+    The run is CPU bound: it goes to the optimizer pool when one is running,
+    otherwise to a worker thread, to keep the event loop responsive.
+    """
+    if _optimizer_pool is not None:
+        descriptor = await asyncio.to_thread(_shared_prices, year, zone)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_optimizer_pool, _optimize_summary, config, descriptor)
+
+    return await asyncio.to_thread(_optimize_summary, config, prices)
+
+
+async def run_optimization(config: Dict[str, Any], year: int, zone: str = DEFAULT_ZONE) -> Dict[str, Any]:
+    """
+    Runs an exact optimization for a battery configuration and returns its summary.
+    Concurrent requests with the same configuration and prices share a single run: later
+    callers wait for the one in progress and receive the same summary, which must not be mutated.
+    """
+    from app.logic.market_data import load_day_ahead_prices
+
+    prices, _ = await asyncio.to_thread(load_day_ahead_prices, year, zone)
+    key = _optimization_key(config, price_fingerprint(prices))
+
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.create_task(_execute_optimization(config, year, zone, prices))
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+    else:
+        logger.info(f"Joining optimization already in progress for {dataset_name(year, zone)}")
+
+    # A caller that goes away (e.g. a closed browser tab) does not cancel the run for the others
+    return await asyncio.shield(task)
+
+
+async def _run_zone(zone: str, projects: List[Dict[str, Any]], year: int) -> List[Dict[str, Any]]:
+    """
+    Runs the projects of one bidding zone as a single batch on the zone's prices.
+    Returns one entry per project with either its summary or its error.
+    """
+    from app.logic.lifetime_simulation import optimizer_config_from_project
+    from app.logic.market_data import load_day_ahead_prices
+
+    configs = [optimizer_config_from_project(project) for project in projects]
+    try:
+        if _optimizer_pool is not None:
+            descriptor = await asyncio.to_thread(_shared_prices, year, zone)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_optimizer_pool, _optimize_batch, configs, descriptor)
+
+        prices, _ = await asyncio.to_thread(load_day_ahead_prices, year, zone)
+        return await asyncio.to_thread(_optimize_batch, configs, prices)
+    except ValueError as e:
+        return [{'summary': None, 'error': str(e)} for _ in projects]
+
+
+async def run_portfolio(projects: List[Dict[str, Any]], year: int) -> Dict[str, Any]:
+    """
+    Runs the optimization of every project of a portfolio on the prices of its country's bidding zone.
+    Projects are grouped by zone: each zone's prices are loaded once and its projects run as one
+    batch, and the zones run in parallel, so the cost grows with the number of zones.
+    """
+    from app.logic.market_data import zone_for_country
+
+    # Result entries of the projects of each zone, alongside the project records
+    zones: Dict[str, List[Tuple[Dict[str, Any], Dict[str, Any]]]] = {}
+    entries = []
+    for project in projects:
+        zone = zone_for_country(project.get('country'))
+        entry = {
+            'project_id': project.get('project_id'),
+            'name': project.get('name'),
+            'zone': zone,
+            'summary': None,
+            'error': None if zone else f"No bidding zone known for country {project.get('country')!r}"
+        }
+        entries.append(entry)
+        if zone:
+            zones.setdefault(zone, []).append((project, entry))
+
+    logger.info(f"Running portfolio of {len(projects)} projects in {len(zones)} bidding zones for {year}")
+    outcomes = await asyncio.gather(*(
+        _run_zone(zone, [project for project, _ in members], year) for zone, members in zones.items()
+    ))
+
+    zone_totals = {}
+    for (zone, members), zone_outcomes in zip(zones.items(), outcomes):
+        for (_, entry), outcome in zip(members, zone_outcomes):
+            entry.update(outcome)
+        revenues = [entry['summary']['total_revenue'] for _, entry in members if entry['summary']]
+        zone_totals[zone] = {'projects': len(members), 'total_revenue': float(sum(revenues))}
+
+    return {'year': year, 'zones': zone_totals, 'projects': entries}
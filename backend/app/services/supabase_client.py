@@ -1,30 +1,47 @@
 import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
-from postgrest import APIResponse
 import logging
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
-# Load environment variables from .env file
-load_dotenv()
+# supabase/postgrest are heavy to import; they are only needed for type hints here
+# and are imported on first use of the client instead of at application startup.
+# Modules annotating with the client type (e.g. the endpoints) import it the same way.
+if TYPE_CHECKING:
+    from supabase import Client
+    from postgrest import APIResponse
 
-url: str | None = os.environ.get("SUPABASE_URL")
-key: str | None = os.environ.get("SUPABASE_ANON_KEY")
+logger = logging.getLogger(__name__)
 
-if not url or not key:
-    raise EnvironmentError("SUPABASE_URL and SUPABASE_ANON_KEY must be set in .env file")
+@lru_cache(maxsize=1)
+def get_supabase_settings() -> tuple[str, str]:
+    """Loads the Supabase URL and key from the environment (and .env file) on first use."""
+    from dotenv import load_dotenv
 
-logger = logging.getLogger(__name__)
+    # Load environment variables from .env file
+    load_dotenv()
+
+    url: str | None = os.environ.get("SUPABASE_URL")
+    key: str | None = os.environ.get("SUPABASE_ANON_KEY")
 
-def get_supabase_client() -> Client:
-    """Creates and returns a Supabase client instance."""
+    if not url or not key:
+        raise EnvironmentError("SUPABASE_URL and SUPABASE_ANON_KEY must be set in .env file")
+
+    return url, key
+
+@lru_cache(maxsize=1)
+def get_supabase_client() -> "Client":
+    """Creates the Supabase client instance on first use and returns the shared instance afterwards."""
     try:
+        from supabase import create_client
+
+        url, key = get_supabase_settings()
         client: Client = create_client(url, key)
         return client
     except Exception as e:
         print(f"Error creating Supabase client: {e}")
         raise
 
-async def fetch_pipelines(client: Client) -> list[dict]:
+async def fetch_pipelines(client: "Client") -> list[dict]:
     """Fetches all pipelines from the Supabase 'pipelines' table."""
     try:
         response: APIResponse = client.table('pipelines').select('*').execute()
@@ -44,7 +61,7 @@ async def fetch_pipelines(client: Client) -> list[dict]:
         # or return an empty list/handle it differently.
         return []
 
-async def insert_pipeline(client: Client, pipeline_data: dict) -> dict:
+async def insert_pipeline(client: "Client", pipeline_data: dict) -> dict:
     """Inserts a new pipeline into the Supabase 'pipelines' table."""
     try:
         response: APIResponse = client.table('pipelines').insert(pipeline_data).execute()
@@ -65,7 +82,7 @@ async def insert_pipeline(client: Client, pipeline_data: dict) -> dict:
         # Re-raise the exception to be handled by the API endpoint
         raise
 
-async def fetch_projects_for_pipeline(client: Client, pipeline_id: str) -> list[dict]:
+async def fetch_projects_for_pipeline(client: "Client", pipeline_id: str) -> list[dict]:
     """Fetches all projects for a specific pipeline_id from the Supabase 'projects' table."""
     if not pipeline_id:
         print("No pipeline_id provided, cannot fetch projects.")
@@ -89,7 +106,7 @@ async def fetch_projects_for_pipeline(client: Client, pipeline_id: str) -> list[
         print(f"An unexpected error occurred fetching projects for pipeline {pipeline_id}: {e}")
         return []
 
-async def insert_project(client: Client, project_data: dict) -> dict:
+async def insert_project(client: "Client", project_data: dict) -> dict:
     """Inserts a new project into the Supabase 'projects' table."""
     try:
         # We expect project_data to be a dict based on ProjectCreate schema
@@ -107,7 +124,7 @@ async def insert_project(client: Client, project_data: dict) -> dict:
         print(f"An unexpected error occurred during project insert: {e}")
         raise
 
-async def fetch_project_by_id(client: Client, project_id: str) -> dict | None:
+async def fetch_project_by_id(client: "Client", project_id: str) -> dict | None:
     """Fetches a single project by its ID from the Supabase 'projects' table."""
     if not project_id:
         logger.warning("fetch_project_by_id called without project_id")
@@ -134,7 +151,7 @@ async def fetch_project_by_id(client: Client, project_id: str) -> dict | None:
         # Depending on how you want to handle errors upstream, you might raise here
         raise # Re-raise the exception to be handled by the endpoint
 
-async def count_projects(client: Client) -> int:
+async def count_projects(client: "Client") -> int:
     """Counts the total number of projects in the Supabase 'projects' table."""
     try:
         response = client.table('projects').select('*', count='exact').execute()
@@ -156,7 +173,7 @@ async def count_projects(client: Client) -> int:
         logger.error(f"An unexpected error occurred during project count: {e}", exc_info=True)
         raise # Re-raise to be handled by the caller
 
-async def count_pipelines(client: Client) -> int:
+async def count_pipelines(client: "Client") -> int:
     """Counts the total number of pipelines in the Supabase 'pipelines' table."""
     try:
         response = client.table('pipelines').select('*', count='exact').execute()
@@ -1,18 +1,35 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 import logging
+import os
 
 # Import the main API router
+# Heavy dependencies (supabase, pandas, the optimizer engines) are imported lazily by the
+# services, so importing the router tree stays cheap. See scripts/check_import_time.py.
 from app.api.v1.api import api_v1_router
+from app.services.supabase_client import get_supabase_settings
+from app.services.logic_service import start_optimizer_pool, shutdown_optimizer_pool
 
 # Configure basic logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fail fast on missing Supabase configuration (the client itself is created on first use)
+    get_supabase_settings()
+    # Pre-fork the optimizer workers and publish the default price data (OPTIMIZER_WORKERS sets the pool size)
+    optimizer_workers = int(os.environ.get("OPTIMIZER_WORKERS", "0")) or None
+    start_optimizer_pool(optimizer_workers)
+    yield
+    shutdown_optimizer_pool()
+
 app = FastAPI(
     title="Renewalytics API",
     description="API for the Renewalytics platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Security headers middleware
@@ -0,0 +1,106 @@
+"""
+Compare the throughput of list endpoints served through FastAPI's response_model handling
+with the TypeAdapter + JSON bytes fast path of app/api/v1/responses.py.
+
+Both routes return the same synthetic project rows, shaped like the rows returned by Supabase,
+so the measurement covers validation and serialization only (no database).
+
+Usage (from the backend directory):
+    python scripts/benchmark_list_endpoints.py [rows]
+"""
+import json
+import os
+import sys
+import time
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api.v1.responses import list_response  # noqa: E402
+from app.schemas.projects_schema import ProjectResponse, project_list_adapter  # noqa: E402
+
+DEFAULT_ROWS = 10_000
+
+RUNS = 5
+
+
+def make_rows(count: int) -> List[dict]:
+    """Synthetic project rows with every field filled in."""
+    return [{
+        'project_id': f'00000000-0000-0000-0000-{i:012d}',
+        'pipeline_id': '11111111-1111-1111-1111-111111111111',
+        'created_at': '2024-05-01T12:00:00+00:00',
+        'name': f'Project {i}',
+        'description': 'Standalone battery storage project',
+        'country': 'Germany',
+        'location': '52.52, 13.40',
+        'type_of_plant': ['BESS'],
+        'technology': 'Li-ion LFP',
+        'hybrid': False,
+        'nominal_power_capacity': 50.0,
+        'max_discharging_power': 50.0,
+        'max_charging_power': 45.0,
+        'nominal_energy_capacity': 100.0,
+        'max_soc': 90.0,
+        'min_soc': 10.0,
+        'charging_efficiency': 95.0,
+        'discharging_efficiency': 95.0,
+        'calendar_lifetime': 15,
+        'cycling_lifetime': 6000,
+        'capex_power': 300.0,
+        'capex_energy': 250.0,
+        'capex_tot': 40000000.0,
+        'opex_power_yr': 5.0,
+        'opex_energy_yr': 2.0,
+        'opex_yr': 450000.0,
+        'revenue_streams': ['Arbitrage', 'FCR']
+    } for i in range(count)]
+
+
+def build_app(rows: List[dict]) -> FastAPI:
+    """Application with the same listing served both ways."""
+    app = FastAPI()
+
+    @app.get('/response-model', response_model=List[ProjectResponse])
+    async def response_model_listing():
+        return rows
+
+    @app.get('/fast-path', response_model=List[ProjectResponse])
+    async def fast_path_listing():
+        return list_response(project_list_adapter, rows)
+
+    return app
+
+
+def best_time(client: TestClient, path: str) -> float:
+    """Best wall time of RUNS requests, in seconds."""
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        client.get(path).raise_for_status()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    client = TestClient(build_app(make_rows(count)))
+
+    if client.get('/response-model').json() != client.get('/fast-path').json():
+        sys.exit("The two routes returned different payloads")
+
+    baseline = best_time(client, '/response-model')
+    fast = best_time(client, '/fast-path')
+
+    print(f"{count} rows, best of {RUNS}")
+    print(f"response_model: {baseline * 1000:7.1f} ms  ({count / baseline:9.0f} rows/s)")
+    print(f"fast path:      {fast * 1000:7.1f} ms  ({count / fast:9.0f} rows/s)")
+    print(f"speedup:        {baseline / fast:7.1f}x")
+    print(json.dumps({'rows': count, 'response_model_ms': baseline * 1000, 'fast_path_ms': fast * 1000}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Check that the dispatch engines give exactly the same results as the original hour-by-hour loop.
+
+BatteryOptimizer.optimize() runs the compiled kernels of app/logic/dispatch_kernels.py, and
+IncrementalSimulation and StreamingDispatch resume the same kernels from checkpoints and chunks.
+All of them promise results identical to the original Python loop, ties between equal revenues
+included. This script keeps a copy of that loop and compares every path against it on a slice
+of the day-ahead prices, for a few battery configurations.
+
+Usage (from the backend directory):
+    python scripts/check_dispatch_equivalence.py
+    python scripts/check_dispatch_equivalence.py --year 2023 --hours 2000
+    NUMBA_DISABLE_JIT=1 python scripts/check_dispatch_equivalence.py   # kernels without JIT compilation
+"""
+import argparse
+import os
+import sys
+import tempfile
+from typing import Dict, List, Any
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, BACKEND_DIR)
+
+from app.logic.battery_optimization import BatteryOptimizer  # noqa: E402
+from app.logic.dispatch_kernels import NUMBA_AVAILABLE  # noqa: E402
+from app.logic.incremental_simulation import IncrementalSimulation  # noqa: E402
+from app.logic.market_data import load_day_ahead_prices  # noqa: E402
+from app.logic.streaming_dispatch import StreamingDispatch  # noqa: E402
+
+# Battery configurations compared, including full SOC windows and a charge-limited battery
+CONFIGS = [
+    {},
+    {'max_charging': 10, 'battery_energy_capacity': 20},
+    {'min_soc': 0.0, 'max_soc': 1.0, 'initial_soc': 0.0},
+    {'max_charging': 3, 'max_discharging': 5, 'battery_energy_capacity': 7, 'initial_soc': 0.9}
+]
+
+# Per-hour fields compared between the engines and the reference loop
+RESULT_FIELDS = ['price', 'action', 'quantity', 'revenue', 'expected_revenue', 'soc',
+                 'charge_revenue', 'discharge_revenue', 'hold_revenue', 'cumulative_revenue']
+
+
+def reference_step(action: str, soc: float, price: float, capacity: float, max_power: float,
+                   min_soc: float, max_soc: float) -> tuple:
+    """Revenue and next SOC of one action, as in the original _evaluate_single_step."""
+    if action == 'charge' and soc < max_soc:
+        quantity = min(max_power, (max_soc - soc) * capacity)
+        return -quantity * price, soc + quantity / capacity
+    if action == 'discharge' and soc > min_soc:
+        quantity = min(max_power, (soc - min_soc) * capacity)
+        return quantity * price, soc - quantity / capacity
+    return 0, soc
+
+
+def reference_evaluate(action: str, soc: float, scenario: np.ndarray, current_price: float,
+                       optimizer: BatteryOptimizer, max_power: float) -> float:
+    """Expected revenue of an action followed by a greedy rollout, as in the original _evaluate_action."""
+    args = (optimizer.battery_energy_capacity, optimizer.min_soc, optimizer.max_soc)
+    revenue, soc = reference_step(action, soc, current_price, args[0], max_power, *args[1:])
+    for price in scenario[1:]:
+        outcomes = {
+            'charge': reference_step('charge', soc, price, args[0], max_power, *args[1:]),
+            'discharge': reference_step('discharge', soc, price, args[0], max_power, *args[1:]),
+            'hold': reference_step('hold', soc, price, args[0], 0, *args[1:])
+        }
+        best = max(outcomes, key=lambda name: outcomes[name][0])
+        revenue += outcomes[best][0]
+        soc = outcomes[best][1]
+    return revenue
+
+
+def reference_optimize(optimizer: BatteryOptimizer, prices: np.ndarray) -> Dict[str, Any]:
+    """The original hour-by-hour BatteryOptimizer.optimize() loop."""
+    soc = optimizer.initial_soc
+    results = []
+    for i, current_price in enumerate(prices):
+        future_prices = prices[i + 1:i + 1 + optimizer.look_ahead]
+        if len(future_prices) == 0:
+            future_prices = np.array([current_price])
+        if len(future_prices) < optimizer.action_horizon:
+            future_prices = np.pad(future_prices, (0, optimizer.action_horizon - len(future_prices)),
+                                   mode='constant', constant_values=future_prices[-1])
+        scenario = future_prices[:optimizer.action_horizon]
+
+        revenues = {
+            'charge': reference_evaluate('charge', soc, scenario, current_price, optimizer, optimizer.max_charging),
+            'discharge': reference_evaluate('discharge', soc, scenario, current_price, optimizer,
+                                            optimizer.max_discharging),
+            'hold': reference_evaluate('hold', soc, scenario, current_price, optimizer, 0)
+        }
+        best = max(revenues, key=revenues.get)
+
+        quantity = 0
+        revenue = 0
+        if best == 'charge' and soc < optimizer.max_soc:
+            quantity = min(optimizer.max_charging, (optimizer.max_soc - soc) * optimizer.battery_energy_capacity)
+            soc += quantity / optimizer.battery_energy_capacity
+            revenue = -quantity * current_price
+        elif best == 'discharge' and soc > optimizer.min_soc:
+            quantity = min(optimizer.max_discharging, (soc - optimizer.min_soc) * optimizer.battery_energy_capacity)
+            soc -= quantity / optimizer.battery_energy_capacity
+            revenue = quantity * current_price
+
+        results.append({
+            'price': float(current_price), 'action': best, 'quantity': float(quantity), 'revenue': float(revenue),
+            'expected_revenue': float(revenues[best]), 'soc': float(soc),
+            'charge_revenue': float(revenues['charge']), 'discharge_revenue': float(revenues['discharge']),
+            'hold_revenue': float(revenues['hold'])
+        })
+
+    cumulative_revenue = 0
+    action_counts = {}
+    for result in results:
+        cumulative_revenue += result['revenue']
+        result['cumulative_revenue'] = float(cumulative_revenue)
+        action_counts[result['action']] = action_counts.get(result['action'], 0) + 1
+
+    summary = {
+        'total_revenue': float(sum(result['revenue'] for result in results)),
+        'action_counts': action_counts,
+        'final_soc': float(soc)
+    }
+    return {'results': results, 'summary': summary}
+
+
+def compare_rows(name: str, expected: List[Dict[str, Any]], actual: List[Dict[str, Any]]) -> List[str]:
+    """Returns a message for the first hour whose results differ, if any."""
+    if len(expected) != len(actual):
+        return [f"{name}: {len(actual)} hours instead of {len(expected)}"]
+    for hour, (a, b) in enumerate(zip(expected, actual)):
+        differing = [field for field in RESULT_FIELDS if a[field] != b[field]]
+        if differing:
+            return [f"{name}: hour {hour} differs in {', '.join(differing)} "
+                    f"({[a[f] for f in differing]} != {[b[f] for f in differing]})"]
+    return []
+
+
+def compare_summary(name: str, expected: Dict[str, Any], actual: Dict[str, Any]) -> List[str]:
+    """Returns a message for every summary field that differs."""
+    return [f"{name}: {key} is {actual.get(key)!r} instead of {value!r}"
+            for key, value in expected.items() if actual.get(key) != value]
+
+
+def check_config(config: Dict[str, Any], prices: np.ndarray, chunk_size: int) -> List[str]:
+    """Compares the kernel, incremental and streaming paths against the reference loop for one configuration."""
+    reference = reference_optimize(BatteryOptimizer(**config), prices)
+    failures = []
+
+    # Kernel path
+    result = BatteryOptimizer(**config).optimize(prices)
+    failures += compare_rows('optimize', reference['results'], result['results'])
+    failures += compare_summary('optimize', reference['summary'], result['summary'])
+
+    # Incremental path: the series arrives day by day, and a price is revised on the way
+    simulation = IncrementalSimulation(BatteryOptimizer(**config))
+    revised = prices.copy()
+    revised[len(prices) // 2] += 1.0
+    for end in range(24, len(prices), 24 * 7):
+        simulation.update(revised[:end])
+    simulation.update(prices[:len(prices) - 24])
+    summary = simulation.update(prices)['summary']
+    failures += compare_summary('incremental', reference['summary'], summary)
+
+    # Streaming path, with the per-hour results written to disk
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'results.csv')
+        chunks = ((prices[start:start + chunk_size], None) for start in range(0, len(prices), chunk_size))
+        summary = StreamingDispatch(BatteryOptimizer(**config)).run(chunks, path)
+        rows = pd.read_csv(path, float_precision='round_trip').to_dict('records')
+    failures += compare_rows('streaming', reference['results'], rows)
+    failures += compare_summary('streaming', reference['summary'], summary)
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--year', type=int, default=2024, help="Price year to take the slice from")
+    parser.add_argument('--hours', type=int, default=24 * 28, help="Length of the price slice")
+    parser.add_argument('--chunk-size', type=int, default=100, help="Chunk size of the streaming path")
+    args = parser.parse_args()
+
+    prices, _ = load_day_ahead_prices(args.year)
+    prices = np.asarray(prices[:args.hours], dtype=float)
+
+    compiled = NUMBA_AVAILABLE and not os.environ.get('NUMBA_DISABLE_JIT')
+    print(f"Comparing against the reference loop on {len(prices)} hours of {args.year} "
+          f"({'compiled' if compiled else 'interpreted'} kernels)")
+    failures = []
+    for config in CONFIGS:
+        config_failures = check_config(config, prices, args.chunk_size)
+        print(f"{'ok  ' if not config_failures else 'FAIL'} {config or 'default configuration'}")
+        failures += config_failures
+
+    for failure in failures:
+        print(f"  {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Measure the import time of the FastAPI application and check it against the startup budget.
+
+Every uvicorn worker and every optimizer pool worker pays this cost when it starts, so heavy
+dependencies must stay out of the import path of main.py.
+
+Usage (from the backend directory):
+    python scripts/check_import_time.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+# Maximum time to import main.py in a fresh interpreter (best of RUNS)
+IMPORT_BUDGET_MS = 600
+
+# Modules that must only be imported on first use, not at application startup
+LAZY_MODULES = ['pandas', 'numpy', 'scipy', 'supabase', 'postgrest', 'app.logic.battery_optimization']
+
+RUNS = 5
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MEASURE_CODE = f"""
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{'elapsed_ms': elapsed_ms, 'loaded': [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def measure() -> dict:
+    """Import main.py in a fresh interpreter and return the elapsed time and eagerly loaded modules."""
+    output = subprocess.run([sys.executable, '-c', MEASURE_CODE], cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    runs = [measure() for _ in range(RUNS)]
+    best_ms = min(run['elapsed_ms'] for run in runs)
+    loaded = runs[0]['loaded']
+
+    print(f"Import time of main.py: {best_ms:.0f} ms (budget {IMPORT_BUDGET_MS} ms, best of {RUNS})")
+    if loaded:
+        print(f"Modules imported eagerly that should be lazy: {', '.join(loaded)}")
+
+    if best_ms > IMPORT_BUDGET_MS or loaded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
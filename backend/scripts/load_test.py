@@ -0,0 +1,253 @@
+"""
+Load test of the FastAPI backend against a local in-memory Supabase stand-in.
+
+Starts scripts/supabase_stub.py and the backend (uvicorn main:app) on local ports, seeds
+the stand-in with pipelines and projects, then runs each scenario at increasing concurrency
+and reports p50/p95/p99 latency and throughput. Use --target to load an already running
+backend instead (it must then be configured against a Supabase instance you can write to).
+
+Scenarios:
+- list:      GET /api/v1/projects/?pipeline_id=... for a random seeded pipeline
+- create:    POST /api/v1/projects/
+- dashboard: GET /api/v1/dashboard/summary
+- optimize:  POST /api/v1/logic/optimize with one of a few battery configurations
+
+Usage (from the backend directory):
+    python scripts/load_test.py --concurrency 1,4,16,64 --requests 200
+    python scripts/load_test.py --scenarios list,dashboard --json results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Any, Callable, Optional
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, BACKEND_DIR)
+
+from scripts.supabase_stub import STUB_ANON_KEY  # noqa: E402
+
+SCENARIOS = ('list', 'create', 'dashboard', 'optimize')
+
+DEFAULT_CONCURRENCY = '1,4,16,64'
+
+# Requests per scenario and concurrency level (the optimize scenario is scaled down, see main)
+DEFAULT_REQUESTS = 200
+
+# Battery configurations used by the optimize scenario (repeats exercise request coalescing)
+OPTIMIZE_CONFIGS = [
+    {'battery_power_capacity': 10, 'battery_energy_capacity': 20, 'max_charging': 10, 'max_discharging': 10},
+    {'battery_power_capacity': 10, 'battery_energy_capacity': 40, 'max_charging': 7, 'max_discharging': 10},
+    {'battery_power_capacity': 50, 'battery_energy_capacity': 100, 'max_charging': 50, 'max_discharging': 50},
+    {'battery_power_capacity': 25, 'battery_energy_capacity': 100, 'max_charging': 25, 'max_discharging': 25}
+]
+
+STARTUP_TIMEOUT_S = 60
+
+
+def free_port() -> int:
+    """Returns a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app: str, port: int, env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    """Starts a uvicorn server for an ASGI app in the backend directory."""
+    return subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', app, '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning'],
+        cwd=BACKEND_DIR, env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+def wait_until_ready(url: str, process: Optional[subprocess.Popen] = None) -> None:
+    """Polls a URL until it answers, failing if the server process exits or the timeout expires."""
+    deadline = time.monotonic() + STARTUP_TIMEOUT_S
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Server for {url} exited with code {process.returncode}")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server for {url} did not start within {STARTUP_TIMEOUT_S} s")
+
+
+def seed_stub(stub_url: str, pipelines: int, projects_per_pipeline: int) -> List[str]:
+    """Inserts pipelines and projects into the stand-in through its REST API and returns the pipeline IDs."""
+    headers = {'apikey': STUB_ANON_KEY, 'Prefer': 'return=representation'}
+    rows = [{'name': f'Pipeline {i}', 'countries': ['Germany']} for i in range(pipelines)]
+    created = httpx.post(f'{stub_url}/rest/v1/pipelines', json=rows, headers=headers).json()
+    pipeline_ids = [row['pipeline_id'] for row in created]
+
+    projects = [project_payload(pipeline_id, j) for pipeline_id in pipeline_ids for j in range(projects_per_pipeline)]
+    httpx.post(f'{stub_url}/rest/v1/projects', json=projects, headers=headers).raise_for_status()
+    return pipeline_ids
+
+
+def project_payload(pipeline_id: str, index: int) -> Dict[str, Any]:
+    """A project as created from the frontend form."""
+    return {
+        'pipeline_id': pipeline_id,
+        'name': f'Project {index}',
+        'country': 'Germany',
+        'type_of_plant': ['BESS'],
+        'technology': 'Li-ion LFP',
+        'nominal_power_capacity': 50.0,
+        'max_discharging_power': 50.0,
+        'max_charging_power': 50.0,
+        'nominal_energy_capacity': 100.0,
+        'max_soc': 90.0,
+        'min_soc': 10.0,
+        'calendar_lifetime': 15,
+        'cycling_lifetime': 6000,
+        'revenue_streams': ['Arbitrage']
+    }
+
+
+def scenario_request(scenario: str, pipeline_ids: List[str]) -> Callable[[httpx.AsyncClient], Any]:
+    """Returns a coroutine function sending one request of a scenario."""
+    if scenario == 'list':
+        return lambda client: client.get('/api/v1/projects/', params={'pipeline_id': random.choice(pipeline_ids)})
+    if scenario == 'create':
+        return lambda client: client.post('/api/v1/projects/',
+                                          json=project_payload(random.choice(pipeline_ids), random.randrange(10_000)))
+    if scenario == 'dashboard':
+        return lambda client: client.get('/api/v1/dashboard/summary')
+    if scenario == 'optimize':
+        return lambda client: client.post('/api/v1/logic/optimize', json=random.choice(OPTIMIZE_CONFIGS))
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    if not sorted_values:
+        return float('nan')
+    rank = max(int(round(q / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+async def run_level(base_url: str, send: Callable, concurrency: int, requests: int) -> Dict[str, Any]:
+    """Sends a number of requests with a fixed number of concurrent clients and summarizes the latencies."""
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                response = await send(client)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'throughput_rps': len(latencies) / elapsed
+    }
+
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    """Prints one table row per scenario and concurrency level."""
+    print(f"{'scenario':<10} {'conc':>5} {'reqs':>6} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8}")
+    for row in results:
+        print(f"{row['scenario']:<10} {row['concurrency']:>5} {row['requests']:>6} {row['errors']:>6} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['throughput_rps']:>8.1f}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help="Comma-separated scenarios to run")
+    parser.add_argument('--concurrency', default=DEFAULT_CONCURRENCY, help="Comma-separated concurrency levels")
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS, help="Requests per scenario and level")
+    parser.add_argument('--pipelines', type=int, default=20, help="Pipelines seeded into the stand-in")
+    parser.add_argument('--projects', type=int, default=50, help="Projects seeded per pipeline")
+    parser.add_argument('--optimizer-workers', type=int, default=0,
+                        help="OPTIMIZER_WORKERS of the backend (0: the backend default)")
+    parser.add_argument('--target', help="URL of an already running backend (skips the stand-in)")
+    parser.add_argument('--pipeline-ids', default='', help="Comma-separated pipeline IDs to use with --target")
+    parser.add_argument('--json', help="Write the results to this JSON file")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed of the request mix")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    random.seed(args.seed)
+    scenarios = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    levels = [int(level) for level in args.concurrency.split(',')]
+    for scenario in scenarios:
+        if scenario not in SCENARIOS:
+            sys.exit(f"Unknown scenario: {scenario} (choose from {', '.join(SCENARIOS)})")
+
+    processes = []
+    try:
+        if args.target:
+            base_url = args.target.rstrip('/')
+            pipeline_ids = [p for p in args.pipeline_ids.split(',') if p]
+            if not pipeline_ids and {'list', 'create'} & set(scenarios):
+                sys.exit("--pipeline-ids is required for the list and create scenarios with --target")
+        else:
+            stub_port, backend_port = free_port(), free_port()
+            stub_url = f'http://127.0.0.1:{stub_port}'
+            processes.append(start_server('scripts.supabase_stub:app', stub_port))
+            wait_until_ready(f'{stub_url}/rest/v1/pipelines', processes[-1])
+            pipeline_ids = seed_stub(stub_url, args.pipelines, args.projects)
+
+            base_url = f'http://127.0.0.1:{backend_port}'
+            processes.append(start_server('main:app', backend_port, {
+                'SUPABASE_URL': stub_url,
+                'SUPABASE_ANON_KEY': STUB_ANON_KEY,
+                'OPTIMIZER_WORKERS': str(args.optimizer_workers)
+            }))
+            wait_until_ready(f'{base_url}/health', processes[-1])
+
+        results = []
+        for scenario in scenarios:
+            send = scenario_request(scenario, pipeline_ids)
+            # One optimization is a full year of dispatch; keep its run time comparable to the others
+            requests = max(args.requests // 10, 1) if scenario == 'optimize' else args.requests
+            asyncio.run(run_level(base_url, send, 1, min(requests, 5)))  # warm-up
+            for concurrency in levels:
+                row = asyncio.run(run_level(base_url, send, concurrency, max(requests, concurrency)))
+                results.append({'scenario': scenario, **row})
+
+        print_report(results)
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(results, f, indent=2)
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+In-memory stand-in for the Supabase REST API (PostgREST), used by the load tests.
+
+Implements the subset of PostgREST used by app/services/supabase_client.py on the
+'pipelines' and 'projects' tables:
+- GET /rest/v1/<table>?select=...&<column>=eq.<value>&limit=<n>
+- Prefer: count=exact (total row count in the Content-Range header)
+- Accept: application/vnd.pgrst.object+json (single row, 406 when there is not exactly one)
+- POST /rest/v1/<table> with one row or a list of rows (Prefer: return=representation)
+
+The real Supabase client can be pointed at it by setting SUPABASE_URL to the stub's address
+and SUPABASE_ANON_KEY to any JWT-shaped string (see STUB_ANON_KEY).
+
+Usage (from the backend directory):
+    python -m uvicorn scripts.supabase_stub:app --port 54321
+"""
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Any
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+# Key accepted by supabase.create_client (it only checks that the key looks like a JWT)
+STUB_ANON_KEY = "loadtest.stub.key"
+
+# Primary key column of each table, generated on insert when missing
+TABLE_KEYS = {
+    'pipelines': 'pipeline_id',
+    'projects': 'project_id'
+}
+
+# Query parameters that are not column filters
+RESERVED_PARAMS = {'select', 'limit', 'offset', 'order', 'columns', 'on_conflict'}
+
+SINGLE_OBJECT_TYPE = "application/vnd.pgrst.object+json"
+
+app = FastAPI(title="Supabase stand-in")
+
+# Rows of each table, in insertion order
+_tables: Dict[str, List[Dict[str, Any]]] = {table: [] for table in TABLE_KEYS}
+
+
+def _error(status_code: int, code: str, message: str, details: str) -> JSONResponse:
+    """PostgREST error body, as parsed into an APIError by postgrest-py."""
+    return JSONResponse(status_code=status_code,
+                        content={'code': code, 'details': details, 'hint': None, 'message': message})
+
+
+def _select(rows: List[Dict[str, Any]], params) -> List[Dict[str, Any]]:
+    """Applies the eq filters, offset, limit and column selection of a query."""
+    for column, condition in params.multi_items():
+        if column in RESERVED_PARAMS:
+            continue
+        operator, _, value = condition.partition('.')
+        if operator != 'eq':
+            raise ValueError(f"Unsupported filter operator: {operator}")
+        rows = [row for row in rows if str(row.get(column)) == value]
+
+    offset = int(params.get('offset', 0))
+    rows = rows[offset:]
+    if 'limit' in params:
+        rows = rows[:int(params['limit'])]
+
+    columns = params.get('select', '*')
+    if columns != '*':
+        names = [name.strip() for name in columns.split(',')]
+        rows = [{name: row.get(name) for name in names} for row in rows]
+    return rows
+
+
+@app.get("/rest/v1/{table}")
+async def select_rows(table: str, request: Request):
+    """Endpoint reading rows of a table (PostgREST GET)."""
+    if table not in _tables:
+        return _error(404, '42P01', f'relation "public.{table}" does not exist', '')
+
+    try:
+        matching = _select(_tables[table], request.query_params)
+    except ValueError as e:
+        return _error(400, 'PGRST100', str(e), '')
+
+    headers = {}
+    if 'count=exact' in request.headers.get('prefer', ''):
+        total = len(matching)
+        headers['Content-Range'] = f"0-{total - 1}/{total}" if total else "*/0"
+
+    if SINGLE_OBJECT_TYPE in request.headers.get('accept', ''):
+        if len(matching) != 1:
+            return _error(406, 'PGRST116', 'JSON object requested, multiple (or no) rows returned',
+                          f'The result contains {len(matching)} rows')
+        return JSONResponse(content=matching[0], headers=headers)
+
+    return JSONResponse(content=matching, headers=headers)
+
+
+@app.post("/rest/v1/{table}")
+async def insert_rows(table: str, request: Request):
+    """Endpoint inserting one or more rows into a table (PostgREST POST)."""
+    if table not in _tables:
+        return _error(404, '42P01', f'relation "public.{table}" does not exist', '')
+
+    body = await request.json()
+    rows = body if isinstance(body, list) else [body]
+
+    inserted = []
+    for row in rows:
+        row = dict(row)
+        row.setdefault(TABLE_KEYS[table], str(uuid.uuid4()))
+        row.setdefault('created_at', datetime.now(timezone.utc).isoformat())
+        _tables[table].append(row)
+        inserted.append(row)
+
+    if 'return=representation' in request.headers.get('prefer', ''):
+        return JSONResponse(status_code=201, content=inserted)
+    return Response(status_code=201)
+